@@ -0,0 +1,104 @@
+"""Shared helpers for the analysis scripts."""
+
+import os
+import re
+import sqlite3
+from pathlib import Path
+
+# orjson parses JSONL lines several times faster; both accept bytes, so
+# callers can read files in binary mode and skip the text decode
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    import json
+    json_loads = json.loads
+
+# Read-side tuning for analysis connections: refuse writes, memory-map up to
+# 512 MB of the database file, keep a 128 MB page cache and do the sorts
+# behind GROUP BY / window queries in memory
+READ_PRAGMAS = """
+PRAGMA query_only = ON;
+PRAGMA mmap_size = 536870912;
+PRAGMA cache_size = -131072;
+PRAGMA temp_store = MEMORY;
+"""
+
+# Field values that mean "not set" in JSONL exports; older exports wrote
+# missing paths as the literal string 'None'. Test with `value not in ...`.
+MISSING_VALUES = frozenset((None, '', 'None'))
+
+# Buffer size for full JSONL scans: one read call per MB instead of per 8 KB
+READ_BUFFER = 1 << 20
+
+# JSONL files up to this size are read with a single call and split in memory
+SLURP_LIMIT = 50 << 20
+
+# JATS wrapper tags that Crossref leaves around abstract text
+JATS_RE = re.compile(r'</?jats:(?:title|p)>')
+
+# "Abstract contains HTML" predicate. `uwss db-migrate` stores the same
+# expression as the indexed generated column has_html_abstract; databases
+# that were not migrated evaluate it per row
+HTML_ABSTRACT_SQL = "coalesce(abstract GLOB '*<*' AND abstract GLOB '*>*', 0)"
+
+
+def connect_readonly(db_path):
+    """Open a SQLite database read-only.
+
+    Unlike sqlite3.connect(path), a missing file raises
+    sqlite3.OperationalError instead of being created empty.
+    """
+    uri = f"{Path(db_path).resolve().as_uri()}?mode=ro"
+    conn = sqlite3.connect(uri, uri=True)
+    conn.executescript(READ_PRAGMAS)
+    return conn
+
+
+def html_abstract_flag(cursor):
+    """Return the SQL for the HTML-in-abstract flag, preferring the generated column."""
+    columns = {row[1] for row in cursor.execute("PRAGMA table_xinfo(documents)")}
+    return "has_html_abstract" if "has_html_abstract" in columns else HTML_ABSTRACT_SQL
+
+
+def list_pdfs(pdf_dir):
+    """Return the directory's PDF entries sorted by name.
+
+    A single os.scandir pass; DirEntry.stat() reuses the directory read
+    where the platform allows, instead of a separate stat per Path.
+    """
+    with os.scandir(pdf_dir) as it:
+        entries = [entry for entry in it if entry.name.endswith('.pdf')]
+    entries.sort(key=lambda entry: entry.name)
+    return entries
+
+
+def jsonl_lines(path):
+    """Yield the non-blank lines of a JSONL file as bytes.
+
+    Files up to SLURP_LIMIT are read whole and split in memory; larger ones
+    are streamed through a READ_BUFFER-sized buffer so memory stays bounded.
+    """
+    path = Path(path)
+    if path.stat().st_size <= SLURP_LIMIT:
+        for line in path.read_bytes().splitlines():
+            if line.strip():
+                yield line
+        return
+    with open(path, 'rb', buffering=READ_BUFFER) as f:
+        for line in f:
+            if line.strip():
+                yield line
+
+
+def count_lines(path):
+    """Count lines in a file by scanning 1 MB binary chunks for newlines.
+
+    Nothing is decoded; a final line without a trailing newline still counts.
+    """
+    n = 0
+    last = b'\n'
+    with open(path, 'rb') as f:
+        for buf in iter(lambda: f.read(1 << 20), b''):
+            n += buf.count(b'\n')
+            last = buf[-1:]
+    return n if last == b'\n' else n + 1
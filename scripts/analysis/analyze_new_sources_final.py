@@ -1,9 +1,117 @@
 """Analyze final results from new sources (Crossref, OpenAlex, Semantic Scholar)."""
 
-import json
-import sqlite3
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
-from collections import defaultdict
+
+from _common import JATS_RE, MISSING_VALUES, READ_BUFFER, json_loads, list_pdfs
+
+SOURCES = ('crossref', 'openalex', 'semantic_scholar')
+SOURCE_SET = frozenset(SOURCES)
+SAMPLES_PER_SOURCE = 5
+
+# Per-source counters are flat lists indexed by these positions
+FIELDS = ('total', 'abstract', 'pdf_downloaded', 'pdf_url', 'doi', 'year',
+          'authors', 'venue', 'html_tags', 'empty_pdf_url')
+TOTAL, ABSTRACT, PDF_DOWNLOADED, PDF_URL, DOI, YEAR, AUTHORS, VENUE, HTML_TAGS, EMPTY_PDF_URL = range(len(FIELDS))
+
+FIELD_LABELS = (
+    (ABSTRACT, 'Abstracts'),
+    (PDF_DOWNLOADED, 'PDFs downloaded'),
+    (PDF_URL, 'PDF URLs'),
+    (DOI, 'DOIs'),
+    (YEAR, 'Years'),
+    (AUTHORS, 'Authors'),
+    (VENUE, 'Venues'),
+)
+
+# Exports smaller than this are parsed in-process; the pool start-up
+# cost outweighs the parallel parse below it
+PARALLEL_MIN_BYTES = 64 * 1024 * 1024
+
+def shard_ranges(path, n_shards):
+    """Split a file into n_shards byte ranges that start on line boundaries."""
+    size = path.stat().st_size
+    bounds = [0]
+    with open(path, 'rb') as f:
+        for i in range(1, n_shards):
+            f.seek(size * i // n_shards)
+            f.readline()  # snap forward to the start of the next line
+            bounds.append(max(f.tell(), bounds[-1]))
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if start < end]
+
+def scan_range(path, start, end):
+    """Parse the JSONL lines in [start, end) of path.
+
+    Returns (total_records, patterns, samples, errors, line_count) where
+    patterns tallies each record's (source, presence flags) and errors holds
+    (line number within the range, message) pairs.
+    """
+    # Statistics: the hot loop only tallies each record's presence-flag
+    # pattern; per-field counters are expanded from the tally afterwards
+    patterns = Counter()
+    total_records = 0
+    errors = []
+    line_num = 0
+
+    # Samples are collected during the same pass as the statistics
+    samples = {source: [] for source in SOURCES}
+    samples_needed = SAMPLES_PER_SOURCE * len(SOURCES)
+
+    # orjson parses bytes directly, skipping the text decode
+    with open(path, 'rb', buffering=READ_BUFFER) as f:
+        f.seek(start)
+        pos = start
+        for line in f:
+            if pos >= end:
+                break
+            pos += len(line)
+            line_num += 1
+            try:
+                data = json_loads(line)
+            except ValueError as e:  # json and orjson decode errors
+                errors.append((line_num, str(e)))
+                continue
+            if not isinstance(data, dict):
+                errors.append((line_num, f"expected a JSON object, got {type(data).__name__}"))
+                continue
+
+            source = data.get('source', 'unknown')
+            total_records += 1
+            if source not in SOURCE_SET:
+                continue
+
+            # Stop sampling once every source has its samples
+            if samples_needed:
+                source_samples = samples[source]
+                if len(source_samples) < SAMPLES_PER_SOURCE:
+                    source_samples.append(data)
+                    samples_needed -= 1
+
+            # Check metadata quality; one presence flag per entry of FIELDS
+            abstract = data.get('abstract')
+            pdf_path = data.get('pdf_path')
+            pdf_url = data.get('pdf_url')
+            flags = (
+                True,
+                bool(abstract),
+                pdf_path not in MISSING_VALUES,
+                pdf_url not in MISSING_VALUES,
+                bool(data.get('doi')),
+                bool(data.get('year')),
+                bool(data.get('authors')),
+                bool(data.get('venue')),
+                # HTML tags in abstracts ('<' also covers '<jats:' tags)
+                bool(abstract) and '<' in abstract,
+                # Empty PDF URLs (our fix)
+                pdf_url == '',
+            )
+            patterns[source, flags] += 1
+
+    return total_records, patterns, samples, errors, line_num
 
 def analyze_final_results():
     """Analyze the final JSONL export with metadata and PDFs."""
@@ -16,135 +124,91 @@ def analyze_final_results():
 
     print("=== FINAL ANALYSIS: NEW SOURCES (CROSSREF, OPENALEX, SEMANTIC SCHOLAR) ===\n")
 
-    # Statistics
-    stats = {
-        'crossref': defaultdict(int),
-        'openalex': defaultdict(int),
-        'semantic_scholar': defaultdict(int)
-    }
-
+    # Large exports are parsed in parallel, one line-aligned shard per core
+    n_shards = 1
+    if jsonl_path.stat().st_size >= PARALLEL_MIN_BYTES:
+        n_shards = os.cpu_count() or 1
+    ranges = shard_ranges(jsonl_path, n_shards)
+    if len(ranges) > 1:
+        with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+            starts, ends = zip(*ranges)
+            results = list(pool.map(scan_range, repeat(jsonl_path), starts, ends))
+    else:
+        results = [scan_range(jsonl_path, *range_) for range_ in ranges]
+
+    # Reduce shard results in file order, so samples stay the first ones per source
+    patterns = Counter()
     total_records = 0
-    records_with_pdf = 0
-    records_with_abstract = 0
-
-    # Read JSONL
-    with open(jsonl_path, 'r', encoding='utf-8') as f:
-        for line_num, line in enumerate(f, 1):
-            try:
-                data = json.loads(line.strip())
-                source = data.get('source', 'unknown')
-                total_records += 1
-
-                if source in stats:
-                    stats[source]['total'] += 1
-
-                    # Check metadata quality
-                    if data.get('abstract'):
-                        stats[source]['abstract'] += 1
-                        records_with_abstract += 1
-
-                    if data.get('pdf_path') and data['pdf_path'] != 'None':
-                        stats[source]['pdf_downloaded'] += 1
-                        records_with_pdf += 1
-
-                    if data.get('pdf_url') and data['pdf_url'] != 'None':
-                        stats[source]['pdf_url'] += 1
-
-                    if data.get('doi'):
-                        stats[source]['doi'] += 1
-
-                    if data.get('year'):
-                        stats[source]['year'] += 1
-
-                    if data.get('authors'):
-                        stats[source]['authors'] += 1
-
-                    if data.get('venue'):
-                        stats[source]['venue'] += 1
-
-                    # Check for HTML tags in abstracts
-                    if data.get('abstract') and ('<jats:' in data['abstract'] or '<' in data['abstract']):
-                        stats[source]['html_tags'] += 1
-
-                    # Check for empty PDF URLs (our fix)
-                    if data.get('pdf_url') == '':
-                        stats[source]['empty_pdf_url'] += 1
-
-            except Exception as e:
-                print(f"Error parsing line {line_num}: {e}")
-                continue
+    samples = {source: [] for source in SOURCES}
+    line_offset = 0
+    for shard_total, shard_patterns, shard_samples, shard_errors, shard_lines in results:
+        total_records += shard_total
+        patterns.update(shard_patterns)
+        for source, records in shard_samples.items():
+            samples[source].extend(records[:SAMPLES_PER_SOURCE - len(samples[source])])
+        for line_num, error in shard_errors:
+            print(f"Error parsing line {line_offset + line_num}: {error}")
+        line_offset += shard_lines
+
+    stats = {source: [0] * len(FIELDS) for source in SOURCES}
+    for (source, flags), n in patterns.items():
+        stats[source] = [count + flag * n for count, flag in zip(stats[source], flags)]
+
+    records_with_abstract = sum(counts[ABSTRACT] for counts in stats.values())
+    records_with_pdf = sum(counts[PDF_DOWNLOADED] for counts in stats.values())
 
     # Display results
-    print("📊 METADATA QUALITY SUMMARY:"    print(f"   Total records: {total_records}")
+    print("📊 METADATA QUALITY SUMMARY:")
+    print(f"   Total records: {total_records}")
     print(f"   Records with abstracts: {records_with_abstract}")
     print(f"   Records with downloaded PDFs: {records_with_pdf}")
     print()
 
     print("📈 BY SOURCE:")
-    for source in ['crossref', 'openalex', 'semantic_scholar']:
-        if stats[source]['total'] > 0:
+    for source in SOURCES:
+        counts = stats[source]
+        total = counts[TOTAL]
+        if total > 0:
             print(f"\n🔹 {source.upper()}:")
-            total = stats[source]['total']
             print(f"   Records: {total}")
-            print(".1f")
-            print(".1f")
-            print(".1f")
-            print(".1f")
-            print(".1f")
-            print(".1f")
-            print(".1f")
+            for index, label in FIELD_LABELS:
+                print(f"   {label}: {counts[index]} ({counts[index] / total * 100:.1f}%)")
 
-            if stats[source]['html_tags'] > 0:
-                print(f"   ⚠️  HTML tags in abstracts: {stats[source]['html_tags']}")
+            if counts[HTML_TAGS] > 0:
+                print(f"   ⚠️  HTML tags in abstracts: {counts[HTML_TAGS]}")
 
-            if stats[source]['empty_pdf_url'] > 0:
-                print(f"   ⚠️  Empty PDF URLs: {stats[source]['empty_pdf_url']}")
+            if counts[EMPTY_PDF_URL] > 0:
+                print(f"   ⚠️  Empty PDF URLs: {counts[EMPTY_PDF_URL]}")
 
     # Sample records
     print("\n" + "="*80)
-    print("📋 SAMPLE RECORDS (5 per source):")
+    print(f"📋 SAMPLE RECORDS ({SAMPLES_PER_SOURCE} per source):")
     print("="*80)
 
-    samples_shown = {'crossref': 0, 'openalex': 0, 'semantic_scholar': 0}
-
-    with open(jsonl_path, 'r', encoding='utf-8') as f:
-        for line in f:
-            try:
-                data = json.loads(line.strip())
-                source = data.get('source', 'unknown')
-
-                if source in samples_shown and samples_shown[source] < 5:
-                    samples_shown[source] += 1
-
-                    print(f"\n📄 {source.upper()} SAMPLE #{samples_shown[source]}:")
-                    print(f"   Title: {data.get('title', 'N/A')[:80]}...")
-                    print(f"   Year: {data.get('year', 'N/A')}")
-                    print(f"   DOI: {data.get('doi', 'N/A')}")
-
-                    abstract = data.get('abstract', '')
-                    if abstract:
-                        # Clean and truncate abstract
-                        clean_abstract = abstract.replace('<jats:title>', '').replace('</jats:title>', '').replace('<jats:p>', '').replace('</jats:p>', '')
-                        clean_abstract = clean_abstract[:150] + "..." if len(clean_abstract) > 150 else clean_abstract
-                        print(f"   Abstract: {clean_abstract}")
-                    else:
-                        print("   Abstract: None"
-
-                    pdf_path = data.get('pdf_path')
-                    if pdf_path and pdf_path != 'None':
-                        print(f"   PDF Downloaded: ✅ {pdf_path}")
-                    else:
-                        print("   PDF Downloaded: ❌ None"
-
-                    status = data.get('status', 'unknown')
-                    print(f"   Status: {status}")
-
-                    # Stop when we have 5 samples from each
-                    if all(count >= 5 for count in samples_shown.values()):
-                        break
-
-            except:
-                continue
+    for source, records in samples.items():
+        for sample_num, data in enumerate(records, 1):
+            print(f"\n📄 {source.upper()} SAMPLE #{sample_num}:")
+            print(f"   Title: {data.get('title', 'N/A')[:80]}...")
+            print(f"   Year: {data.get('year', 'N/A')}")
+            print(f"   DOI: {data.get('doi', 'N/A')}")
+
+            abstract = data.get('abstract', '')
+            if abstract:
+                # Clean and truncate abstract
+                clean_abstract = JATS_RE.sub('', abstract)
+                clean_abstract = clean_abstract[:150] + "..." if len(clean_abstract) > 150 else clean_abstract
+                print(f"   Abstract: {clean_abstract}")
+            else:
+                print("   Abstract: None")
+
+            pdf_path = data.get('pdf_path')
+            if pdf_path not in MISSING_VALUES:
+                print(f"   PDF Downloaded: ✅ {pdf_path}")
+            else:
+                print("   PDF Downloaded: ❌ None")
+
+            status = data.get('status', 'unknown')
+            print(f"   Status: {status}")
 
     # Check for new PDF files
     pdf_dirs = [
@@ -160,13 +224,13 @@ def analyze_final_results():
     total_new_pdfs = 0
     for pdf_dir in pdf_dirs:
         if pdf_dir.exists():
-            pdf_files = list(pdf_dir.glob("*.pdf"))
+            pdf_files = list_pdfs(pdf_dir)
             if pdf_files:
                 print(f"\n📂 {pdf_dir.name}: {len(pdf_files)} files")
                 total_new_pdfs += len(pdf_files)
-                for pdf_file in sorted(pdf_files)[:3]:  # Show first 3
+                for pdf_file in pdf_files[:3]:  # Show first 3
                     size_mb = pdf_file.stat().st_size / (1024 * 1024)
-                    print(".1f")
+                    print(f"   - {pdf_file.name} ({size_mb:.1f} MB)")
                 if len(pdf_files) > 3:
                     print(f"   ... and {len(pdf_files) - 3} more files")
         else:
@@ -178,7 +242,7 @@ def analyze_final_results():
         # Check if PDFs are in paperscraper_pdfs
         paperscraper_pdf_dir = Path("data/paperscraper_pdfs")
         if paperscraper_pdf_dir.exists():
-            existing_pdfs = list(paperscraper_pdf_dir.glob("*.pdf"))
+            existing_pdfs = list_pdfs(paperscraper_pdf_dir)
             print(f"\nℹ️  Existing PDFs from previous tests: {len(existing_pdfs)} files in paperscraper_pdfs/")
 
     print("\n" + "="*80)
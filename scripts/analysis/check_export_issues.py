@@ -1,8 +1,8 @@
 """Check for issues in export file vs database."""
-import json
-import sqlite3
 from pathlib import Path
 
+from _common import connect_readonly, json_loads, jsonl_lines
+
 db_path = Path("data/test_paperscraper.sqlite")
 export_path = Path("data/paperscraper_export.jsonl")
 
@@ -11,12 +11,17 @@ print("CHECKING FOR ISSUES")
 print("=" * 80)
 
 # Check database
-conn = sqlite3.connect(db_path)
+conn = connect_readonly(db_path)
 cursor = conn.cursor()
 
-# Check abstract in database
-cursor.execute("SELECT COUNT(*) FROM documents WHERE abstract IS NOT NULL AND abstract != ''")
-db_with_abstract = cursor.fetchone()[0]
+# Check abstracts and PDF URLs in database in one scan
+cursor.execute("""
+    SELECT
+        SUM(abstract IS NOT NULL AND abstract != ''),
+        SUM(pdf_url IS NOT NULL AND pdf_url != '')
+    FROM documents
+""")
+db_with_abstract, db_with_pdf_url = cursor.fetchone()
 
 cursor.execute("SELECT id, title, abstract FROM documents WHERE abstract IS NOT NULL AND abstract != '' LIMIT 3")
 db_samples = cursor.fetchall()
@@ -28,13 +33,11 @@ for doc_id, title, abstract in db_samples:
 
 # Check export file
 export_lines = []
-with open(export_path, 'r', encoding='utf-8') as f:
-    for line in f:
-        if line.strip():
-            try:
-                export_lines.append(json.loads(line))
-            except json.JSONDecodeError as e:
-                print(f"  ERROR: Invalid JSON on line: {e}")
+for line in jsonl_lines(export_path):
+    try:
+        export_lines.append(json_loads(line))
+    except ValueError as e:  # json and orjson decode errors
+        print(f"  ERROR: Invalid JSON on line: {e}")
 
 print(f"\n[Export File] Total records: {len(export_lines)}")
 
@@ -67,9 +70,6 @@ if db_with_abstract > export_with_abstract:
     print(f"  ⚠️  WARNING: Export missing {db_with_abstract - export_with_abstract} abstracts!")
 
 # Check PDF URLs
-cursor.execute("SELECT COUNT(*) FROM documents WHERE pdf_url IS NOT NULL AND pdf_url != ''")
-db_with_pdf_url = cursor.fetchone()[0]
-
 export_with_pdf_url = sum(1 for r in export_lines if r.get('pdf_url'))
 print(f"\n  Database PDF URLs: {db_with_pdf_url}")
 print(f"  Export PDF URLs: {export_with_pdf_url}")
@@ -1,20 +1,29 @@
 """Check paperscraper data in database and export to files."""
-import sqlite3
 import json
 from pathlib import Path
 
+from _common import connect_readonly
+
 db_path = Path("data/test_paperscraper.sqlite")
 
 if not db_path.exists():
     print(f"Database not found: {db_path}")
     exit(1)
 
-conn = sqlite3.connect(db_path)
+conn = connect_readonly(db_path)
 cursor = conn.cursor()
 
-# Check total documents
-cursor.execute("SELECT COUNT(*) FROM documents")
-total = cursor.fetchone()[0]
+# Check total documents and metadata quality in one scan
+cursor.execute("""
+    SELECT
+        COUNT(*),
+        SUM(abstract IS NOT NULL AND abstract != ''),
+        SUM(pdf_url IS NOT NULL AND pdf_url != ''),
+        SUM(doi IS NOT NULL AND doi != ''),
+        SUM(local_path IS NOT NULL AND local_path != '')
+    FROM documents
+""")
+total, with_abstract, with_pdf_url, with_doi, with_pdf_file = cursor.fetchone()
 print(f"Total documents in database: {total}")
 
 # Check by source
@@ -22,19 +31,6 @@ cursor.execute("SELECT source, COUNT(*) FROM documents GROUP BY source")
 sources = dict(cursor.fetchall())
 print(f"\nBy source: {sources}")
 
-# Check metadata quality
-cursor.execute("SELECT COUNT(*) FROM documents WHERE abstract IS NOT NULL AND abstract != ''")
-with_abstract = cursor.fetchone()[0]
-
-cursor.execute("SELECT COUNT(*) FROM documents WHERE pdf_url IS NOT NULL AND pdf_url != ''")
-with_pdf_url = cursor.fetchone()[0]
-
-cursor.execute("SELECT COUNT(*) FROM documents WHERE doi IS NOT NULL AND doi != ''")
-with_doi = cursor.fetchone()[0]
-
-cursor.execute("SELECT COUNT(*) FROM documents WHERE local_path IS NOT NULL AND local_path != ''")
-with_pdf_file = cursor.fetchone()[0]
-
 print(f"\nMetadata quality:")
 print(f"  With abstract: {with_abstract}/{total} ({with_abstract/total*100:.1f}%)")
 print(f"  With PDF URL: {with_pdf_url}/{total} ({with_pdf_url/total*100:.1f}%)")
@@ -1,23 +1,27 @@
 """Check remaining issues after fixes."""
 
-import sqlite3
 from pathlib import Path
 
+from _common import connect_readonly, html_abstract_flag
+
 DB_PATH = Path("data/test_new_sources.sqlite")
 
 if not DB_PATH.exists():
     print(f"Database not found: {DB_PATH}")
     exit(1)
 
-conn = sqlite3.connect(DB_PATH)
+conn = connect_readonly(DB_PATH)
 cursor = conn.cursor()
 
+# Prefer the indexed generated column added by `uwss db-migrate`
+html_flag = html_abstract_flag(cursor)
+
 # Check HTML tags
 print("=== HTML TAGS IN ABSTRACTS ===\n")
-cursor.execute("""
+cursor.execute(f"""
     SELECT source, abstract
     FROM documents
-    WHERE abstract LIKE '%<%' AND abstract LIKE '%>%'
+    WHERE {html_flag}
     LIMIT 5
 """)
 rows = cursor.fetchall()
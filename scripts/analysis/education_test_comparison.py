@@ -1,17 +1,23 @@
 """Compare OpenAlex performance between corrosion and education topics."""
 
-import sqlite3
 import yaml
+from _common import connect_readonly
+
+# Prefer the libyaml C parser; PyYAML builds without libyaml only have the Python one
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
 
 def compare_topics():
     print("=== OPENALEX TOPIC COMPARISON ===\n")
 
     # Load both configs
     with open('config/config.yaml', 'r') as f:
-        corrosion_config = yaml.safe_load(f)
+        corrosion_config = yaml.load(f, Loader=SafeLoader)
 
     with open('config_education.yaml', 'r') as f:
-        education_config = yaml.safe_load(f)
+        education_config = yaml.load(f, Loader=SafeLoader)
 
     print("Topic Comparison:")
     print(f"Corrosion keywords: {len(corrosion_config.get('domain_keywords', []))}")
@@ -22,7 +28,7 @@ def compare_topics():
 
     # Check corrosion results
     try:
-        conn_corrosion = sqlite3.connect('data/test_new_sources.sqlite')
+        conn_corrosion = connect_readonly('data/test_new_sources.sqlite')
         cursor_corrosion = conn_corrosion.cursor()
         cursor_corrosion.execute("SELECT COUNT(*) FROM documents WHERE source = 'openalex'")
         corrosion_count = cursor_corrosion.fetchone()[0]
@@ -32,7 +38,7 @@ def compare_topics():
 
     # Check education results
     try:
-        conn_education = sqlite3.connect('data/test_openalex_education.sqlite')
+        conn_education = connect_readonly('data/test_openalex_education.sqlite')
         cursor_education = conn_education.cursor()
         cursor_education.execute("SELECT COUNT(*) FROM documents")
         education_count = cursor_education.fetchone()[0]
@@ -1,31 +1,36 @@
 """Generate detailed report files for user review."""
 
+import csv
 import json
-import sqlite3
-from pathlib import Path
 from datetime import datetime
+from pathlib import Path
+
+from _common import connect_readonly, html_abstract_flag
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 DB_PATH = Path("data/test_new_sources.sqlite")
 OUTPUT_DIR = Path("data/reports")
 OUTPUT_DIR.mkdir(exist_ok=True)
 
-def generate_json_report():
-    """Generate detailed JSON report."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    
-    # Get all records
-    cursor.execute("SELECT * FROM documents ORDER BY source, id")
-    rows = cursor.fetchall()
-    
-    records = []
-    for row in rows:
-        record = dict(row)
-        records.append(record)
-    
-    # Statistics
-    cursor.execute("""
+def dumps_indented(obj):
+    """Serialize obj as 2-space indented UTF-8 JSON, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
+# Column order of the rows returned by source_stats()
+STATS_COLUMNS = (
+    "source", "total", "has_abstract", "has_pdf_url", "has_doi", "has_authors",
+    "has_year", "has_venue", "html_in_abstract", "empty_pdf_url",
+)
+
+def source_stats(cursor, html_flag):
+    """Return per-source metadata counts as tuples ordered like STATS_COLUMNS."""
+    cursor.execute(f"""
         SELECT 
             source,
             COUNT(*) as total,
@@ -35,73 +40,87 @@ def generate_json_report():
             SUM(CASE WHEN authors IS NOT NULL AND authors != '' THEN 1 ELSE 0 END) as has_authors,
             SUM(CASE WHEN year IS NOT NULL THEN 1 ELSE 0 END) as has_year,
             SUM(CASE WHEN venue IS NOT NULL AND venue != '' THEN 1 ELSE 0 END) as has_venue,
-            SUM(CASE WHEN abstract LIKE '%<%' AND abstract LIKE '%>%' THEN 1 ELSE 0 END) as html_in_abstract,
+            SUM({html_flag}) as html_in_abstract,
             SUM(CASE WHEN pdf_url = '' THEN 1 ELSE 0 END) as empty_pdf_url
         FROM documents
         GROUP BY source
     """)
-    stats = []
-    for row in cursor.fetchall():
-        stats.append(dict(row))
+    return cursor.fetchall()
+
+def generate_json_report():
+    """Generate detailed JSON report."""
+    conn = connect_readonly(DB_PATH)
+    cursor = conn.cursor()
+    
+    # Get all records as one JSON array built by SQLite, so no per-row
+    # dicts are created (or re-serialized) in Python
+    # JSON cannot hold BLOBs (title_hash), so those are written as hex text
+    columns = [row[1:3] for row in cursor.execute("PRAGMA table_info(documents)")]
+    json_fields = ", ".join(
+        f"'{name}', nullif(lower(hex({name})), '')" if col_type.upper() == "BLOB" else f"'{name}', {name}"
+        for name, col_type in columns
+    )
+    cursor.execute(f"""
+        SELECT COUNT(*), json_group_array(json_object({json_fields}))
+        FROM (SELECT * FROM documents ORDER BY source, id)
+    """)
+    total_records, records_json = cursor.fetchone()
+    
+    # Statistics
+    html_flag = html_abstract_flag(cursor)
+    stats = [dict(zip(STATS_COLUMNS, row)) for row in source_stats(cursor, html_flag)]
     
     report = {
         "generated_at": datetime.now().isoformat(),
         "database": str(DB_PATH),
-        "total_records": len(records),
+        "total_records": total_records,
         "statistics_by_source": stats,
-        "records": records
     }
+    summary = dumps_indented(report)
     
     output_file = OUTPUT_DIR / "detailed_report.json"
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(report, f, indent=2, ensure_ascii=False)
+    with open(output_file, "wb") as f:
+        # Splice the pre-serialized records in as the last key of the report
+        f.write(summary[:-2])
+        f.write(b',\n  "records": ')
+        f.write(records_json.encode("utf-8"))
+        f.write(b"\n}\n")
     
     print(f"Generated JSON report: {output_file}")
     conn.close()
 
 def generate_markdown_report():
     """Generate Markdown report."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
+    conn = connect_readonly(DB_PATH)
     cursor = conn.cursor()
     
     # Statistics
-    cursor.execute("""
-        SELECT 
-            source,
-            COUNT(*) as total,
-            SUM(CASE WHEN abstract IS NOT NULL AND abstract != '' THEN 1 ELSE 0 END) as has_abstract,
-            SUM(CASE WHEN pdf_url IS NOT NULL AND pdf_url != '' THEN 1 ELSE 0 END) as has_pdf_url,
-            SUM(CASE WHEN doi IS NOT NULL AND doi != '' THEN 1 ELSE 0 END) as has_doi,
-            SUM(CASE WHEN authors IS NOT NULL AND authors != '' THEN 1 ELSE 0 END) as has_authors,
-            SUM(CASE WHEN year IS NOT NULL THEN 1 ELSE 0 END) as has_year,
-            SUM(CASE WHEN venue IS NOT NULL AND venue != '' THEN 1 ELSE 0 END) as has_venue,
-            SUM(CASE WHEN abstract LIKE '%<%' AND abstract LIKE '%>%' THEN 1 ELSE 0 END) as html_in_abstract,
-            SUM(CASE WHEN pdf_url = '' THEN 1 ELSE 0 END) as empty_pdf_url
-        FROM documents
-        GROUP BY source
-    """)
-    stats = [dict(row) for row in cursor.fetchall()]
+    html_flag = html_abstract_flag(cursor)
+    stats = source_stats(cursor, html_flag)
     
-    # Sample records by source
-    samples = {}
-    for source in ["crossref", "openalex", "semantic_scholar"]:
-        cursor.execute("""
-            SELECT title, abstract, pdf_url, doi, year, authors, venue
+    # Sample records by source: first 5 per source in one windowed query
+    samples = {source: [] for source in ["crossref", "openalex", "semantic_scholar"]}
+    cursor.execute("""
+        SELECT source, title, abstract, pdf_url, doi, year, venue
+        FROM (
+            SELECT *, ROW_NUMBER() OVER (PARTITION BY source ORDER BY id) AS rn
             FROM documents
-            WHERE source = ?
-            LIMIT 5
-        """, (source,))
-        samples[source] = [dict(row) for row in cursor.fetchall()]
+            WHERE source IN ('crossref', 'openalex', 'semantic_scholar')
+        )
+        WHERE rn <= 5
+        ORDER BY source, rn
+    """)
+    for source, *record in cursor:
+        samples[source].append(record)
     
     # Issues
-    cursor.execute("""
+    cursor.execute(f"""
         SELECT source, title, abstract
         FROM documents
-        WHERE abstract LIKE '%<%' AND abstract LIKE '%>%'
+        WHERE {html_flag}
         LIMIT 10
     """)
-    html_issues = [dict(row) for row in cursor.fetchall()]
+    html_issues = cursor.fetchall()
     
     cursor.execute("""
         SELECT source, title, pdf_url
@@ -109,10 +128,10 @@ def generate_markdown_report():
         WHERE pdf_url = ''
         LIMIT 10
     """)
-    empty_pdf_issues = [dict(row) for row in cursor.fetchall()]
+    empty_pdf_issues = cursor.fetchall()
     
-    # Generate Markdown
-    md = f"""# Scale Test Report
+    # Generate Markdown as a list of fragments joined once at the end
+    md = [f"""# Scale Test Report
 
 **Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}  
 **Database:** `{DB_PATH}`
@@ -121,66 +140,66 @@ def generate_markdown_report():
 
 | Source | Total | Abstract | PDF URL | DOI | Authors | Year | Venue | HTML Issues | Empty PDF |
 |--------|-------|----------|---------|-----|---------|------|-------|-------------|-----------|
-"""
+"""]
     
-    for stat in stats:
-        total = stat['total']
-        md += f"| {stat['source']} | {total} | "
-        md += f"{stat['has_abstract']} ({stat['has_abstract']/total*100:.1f}%) | "
-        md += f"{stat['has_pdf_url']} ({stat['has_pdf_url']/total*100:.1f}%) | "
-        md += f"{stat['has_doi']} ({stat['has_doi']/total*100:.1f}%) | "
-        md += f"{stat['has_authors']} ({stat['has_authors']/total*100:.1f}%) | "
-        md += f"{stat['has_year']} ({stat['has_year']/total*100:.1f}%) | "
-        md += f"{stat['has_venue']} ({stat['has_venue']/total*100:.1f}%) | "
-        md += f"{stat['html_in_abstract']} | {stat['empty_pdf_url']} |\n"
+    for source, total, *present, html_in_abstract, empty_pdf_url in stats:
+        md.append(f"| {source} | {total} | ")
+        for count in present:
+            md.append(f"{count} ({count/total*100:.1f}%) | ")
+        md.append(f"{html_in_abstract} | {empty_pdf_url} |\n")
     
-    md += "\n## Sample Records by Source\n\n"
+    md.append("\n## Sample Records by Source\n\n")
     
     for source, records in samples.items():
-        md += f"### {source.upper()}\n\n"
-        for i, rec in enumerate(records, 1):
-            md += f"#### Sample {i}\n\n"
-            md += f"- **Title:** {rec['title']}\n"
-            md += f"- **Year:** {rec['year']}\n"
-            md += f"- **DOI:** {rec['doi'] or 'None'}\n"
-            md += f"- **PDF URL:** {rec['pdf_url'] or 'None'}\n"
-            md += f"- **Venue:** {rec['venue'] or 'None'}\n"
-            if rec['abstract']:
-                abstract_preview = rec['abstract'][:200] + "..." if len(rec['abstract']) > 200 else rec['abstract']
-                md += f"- **Abstract:** {abstract_preview}\n"
+        md.append(f"### {source.upper()}\n\n")
+        for i, (title, abstract, pdf_url, doi, year, venue) in enumerate(records, 1):
+            md.append(f"#### Sample {i}\n\n")
+            md.append(f"- **Title:** {title}\n")
+            md.append(f"- **Year:** {year}\n")
+            md.append(f"- **DOI:** {doi or 'None'}\n")
+            md.append(f"- **PDF URL:** {pdf_url or 'None'}\n")
+            md.append(f"- **Venue:** {venue or 'None'}\n")
+            if abstract:
+                abstract_preview = abstract[:200] + "..." if len(abstract) > 200 else abstract
+                md.append(f"- **Abstract:** {abstract_preview}\n")
             else:
-                md += f"- **Abstract:** None\n"
-            md += "\n"
+                md.append(f"- **Abstract:** None\n")
+            md.append("\n")
     
     if html_issues:
-        md += "\n## HTML Tags in Abstracts (Issues)\n\n"
-        for issue in html_issues:
-            md += f"### {issue['source']}: {issue['title'][:80]}\n\n"
-            abstract_preview = issue['abstract'][:300] + "..." if len(issue['abstract']) > 300 else issue['abstract']
-            md += f"```\n{abstract_preview}\n```\n\n"
+        md.append("\n## HTML Tags in Abstracts (Issues)\n\n")
+        for source, title, abstract in html_issues:
+            md.append(f"### {source}: {title[:80]}\n\n")
+            abstract_preview = abstract[:300] + "..." if len(abstract) > 300 else abstract
+            md.append(f"```\n{abstract_preview}\n```\n\n")
     
     if empty_pdf_issues:
-        md += "\n## Empty PDF URLs (Issues)\n\n"
-        for issue in empty_pdf_issues:
-            md += f"- **{issue['source']}:** {issue['title'][:80]}\n"
-            md += f"  - PDF URL: `{repr(issue['pdf_url'])}`\n\n"
+        md.append("\n## Empty PDF URLs (Issues)\n\n")
+        for source, title, pdf_url in empty_pdf_issues:
+            md.append(f"- **{source}:** {title[:80]}\n")
+            md.append(f"  - PDF URL: `{repr(pdf_url)}`\n\n")
     
     output_file = OUTPUT_DIR / "detailed_report.md"
     with open(output_file, "w", encoding="utf-8") as f:
-        f.write(md)
+        f.write("".join(md))
     
     print(f"Generated Markdown report: {output_file}")
     conn.close()
 
 def generate_csv_by_source():
     """Generate CSV files by source."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
+    conn = connect_readonly(DB_PATH)
     cursor = conn.cursor()
     
     sources = ["crossref", "openalex", "semantic_scholar"]
     
+    cursor.execute("SELECT source, COUNT(*) FROM documents GROUP BY source")
+    counts = dict(cursor.fetchall())
+    
     for source in sources:
+        if not counts.get(source):
+            continue
+        
         cursor.execute("""
             SELECT 
                 id, source, title, abstract, pdf_url, doi, year, 
@@ -190,21 +209,15 @@ def generate_csv_by_source():
             ORDER BY id
         """, (source,))
         
-        rows = cursor.fetchall()
-        
-        if not rows:
-            continue
-        
-        import csv
         output_file = OUTPUT_DIR / f"{source}_records.csv"
         
+        # Stream rows straight from the cursor; no intermediate list or dicts
         with open(output_file, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=rows[0].keys())
-            writer.writeheader()
-            for row in rows:
-                writer.writerow(dict(row))
+            writer = csv.writer(f)
+            writer.writerow([column[0] for column in cursor.description])
+            writer.writerows(cursor)
         
-        print(f"Generated CSV for {source}: {output_file} ({len(rows)} records)")
+        print(f"Generated CSV for {source}: {output_file} ({counts[source]} records)")
     
     conn.close()
 
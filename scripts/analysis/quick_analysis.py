@@ -1,67 +1,66 @@
 """Quick analysis of new sources test results."""
 
-import json
-import sqlite3
 from pathlib import Path
 
-def quick_stats():
+from _common import (
+    JATS_RE,
+    MISSING_VALUES,
+    connect_readonly,
+    html_abstract_flag,
+    json_loads,
+    list_pdfs,
+)
+
+DB_PATH = Path("data/test_new_sources.sqlite")
+
+# Counts, metadata quality and issue checks for every source in one scan;
+# {html_flag} is filled in with html_abstract_flag()
+STATS_SQL = """
+    SELECT
+        source,
+        COUNT(*) as total,
+        SUM(CASE WHEN abstract IS NOT NULL AND abstract != '' THEN 1 ELSE 0 END) as has_abstract,
+        SUM(CASE WHEN pdf_url IS NOT NULL AND pdf_url != '' THEN 1 ELSE 0 END) as has_pdf_url,
+        SUM(CASE WHEN doi IS NOT NULL AND doi != '' THEN 1 ELSE 0 END) as has_doi,
+        SUM(CASE WHEN authors IS NOT NULL AND authors != '' THEN 1 ELSE 0 END) as has_authors,
+        SUM(CASE WHEN year IS NOT NULL THEN 1 ELSE 0 END) as has_year,
+        SUM({html_flag}) as html_abstracts,
+        SUM(CASE WHEN pdf_url = '' THEN 1 ELSE 0 END) as empty_pdf_urls
+    FROM documents
+    GROUP BY source
+    ORDER BY source
+"""
+
+def quick_stats(conn):
     """Get quick statistics from the database."""
-    db_path = Path("data/test_new_sources.sqlite")
-
-    if not db_path.exists():
-        print("Database not found!")
-        return
-
-    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
 
-    # Get counts by source
-    cursor.execute("SELECT source, COUNT(*) as count FROM documents GROUP BY source ORDER BY source")
-    sources = cursor.fetchall()
+    cursor.execute(STATS_SQL.format(html_flag=html_abstract_flag(cursor)))
+    rows = cursor.fetchall()
 
     print("=== DATABASE STATISTICS ===")
     total = 0
-    for source, count in sources:
+    for source, count, *_ in rows:
         print(f"{source}: {count} records")
         total += count
     print(f"Total: {total} records\n")
 
     # Get metadata quality
     print("=== METADATA QUALITY ===")
-    for source, _ in sources:
-        cursor.execute("""
-            SELECT
-                COUNT(*) as total,
-                SUM(CASE WHEN abstract IS NOT NULL AND abstract != '' THEN 1 ELSE 0 END) as has_abstract,
-                SUM(CASE WHEN pdf_url IS NOT NULL AND pdf_url != '' THEN 1 ELSE 0 END) as has_pdf_url,
-                SUM(CASE WHEN doi IS NOT NULL AND doi != '' THEN 1 ELSE 0 END) as has_doi,
-                SUM(CASE WHEN authors IS NOT NULL AND authors != '' THEN 1 ELSE 0 END) as has_authors,
-                SUM(CASE WHEN year IS NOT NULL THEN 1 ELSE 0 END) as has_year
-            FROM documents WHERE source = ?
-        """, (source,))
-
-        row = cursor.fetchone()
-        if row:
-            total, has_abstract, has_pdf_url, has_doi, has_authors, has_year = row
-            if total > 0:
-                print(f"\n{source.upper()}:")
-                print(".1f")
-                print(".1f")
-                print(".1f")
-                print(".1f")
-                print(".1f")
+    for source, total, has_abstract, has_pdf_url, has_doi, has_authors, has_year, _, _ in rows:
+        if total > 0:
+            print(f"\n{source.upper()}:")
+            print(f"  Abstracts: {has_abstract/total*100:.1f}% ({has_abstract}/{total})")
+            print(f"  PDF URLs: {has_pdf_url/total*100:.1f}% ({has_pdf_url}/{total})")
+            print(f"  DOIs: {has_doi/total*100:.1f}% ({has_doi}/{total})")
+            print(f"  Authors: {has_authors/total*100:.1f}% ({has_authors}/{total})")
+            print(f"  Years: {has_year/total*100:.1f}% ({has_year}/{total})")
 
     # Check for issues
     print("\n=== ISSUES CHECK ===")
 
     # HTML tags in abstracts
-    cursor.execute("""
-        SELECT source, COUNT(*) as count
-        FROM documents
-        WHERE abstract LIKE '%<%' AND abstract LIKE '%>%'
-        GROUP BY source
-    """)
-    html_issues = cursor.fetchall()
+    html_issues = [(row[0], row[7]) for row in rows if row[7]]
     if html_issues:
         print("HTML tags in abstracts:")
         for source, count in html_issues:
@@ -70,13 +69,7 @@ def quick_stats():
         print("No HTML tags found in abstracts")
 
     # Empty PDF URLs
-    cursor.execute("""
-        SELECT source, COUNT(*) as count
-        FROM documents
-        WHERE pdf_url = ''
-        GROUP BY source
-    """)
-    empty_pdf_issues = cursor.fetchall()
+    empty_pdf_issues = [(row[0], row[8]) for row in rows if row[8]]
     if empty_pdf_issues:
         print("Empty PDF URLs:")
         for source, count in empty_pdf_issues:
@@ -84,8 +77,6 @@ def quick_stats():
     else:
         print("No empty PDF URLs found")
 
-    conn.close()
-
 def check_pdf_files():
     """Check downloaded PDF files."""
     print("\n=== PDF FILES DOWNLOADED ===")
@@ -100,7 +91,7 @@ def check_pdf_files():
     total_new_pdfs = 0
     for pdf_dir in pdf_dirs:
         if pdf_dir.exists():
-            pdf_files = list(pdf_dir.glob("*.pdf"))
+            pdf_files = list_pdfs(pdf_dir)
             if pdf_files:
                 print(f"{pdf_dir.name}: {len(pdf_files)} files")
                 total_new_pdfs += len(pdf_files)
@@ -115,7 +106,7 @@ def check_pdf_files():
     # Check existing PDFs
     paperscraper_dir = Path("data/paperscraper_pdfs")
     if paperscraper_dir.exists():
-        existing_pdfs = list(paperscraper_dir.glob("*.pdf"))
+        existing_pdfs = list_pdfs(paperscraper_dir)
         print(f"\nExisting PDFs (from previous tests): {len(existing_pdfs)} files")
 
 def sample_records():
@@ -128,11 +119,11 @@ def sample_records():
 
     print("\n=== SAMPLE RECORDS FROM JSONL ===")
 
-    with open(jsonl_path, 'r', encoding='utf-8') as f:
+    with open(jsonl_path, 'rb') as f:
         for i, line in enumerate(f):
             if i >= 10:  # Show records 11-15
                 try:
-                    data = json.loads(line.strip())
+                    data = json_loads(line)
                     print(f"\nRecord {i+1}:")
                     print(f"  Source: {data.get('source')}")
                     print(f"  Title: {data.get('title', 'N/A')[:80]}...")
@@ -141,13 +132,13 @@ def sample_records():
                     print(f"  Relevance Score: {data.get('relevance_score', 'N/A')}")
 
                     if data.get('abstract'):
-                        abstract = data['abstract'][:100].replace('<jats:p>', '').replace('</jats:p>', '').replace('<jats:title>', '').replace('</jats:title>', '')
+                        abstract = JATS_RE.sub('', data['abstract'][:100])
                         print(f"  Abstract: {abstract}...")
                     else:
                         print("  Abstract: None")
 
                     pdf_path = data.get('pdf_path')
-                    if pdf_path and pdf_path != 'None':
+                    if pdf_path not in MISSING_VALUES:
                         print(f"  PDF Downloaded: Yes ({pdf_path})")
                     else:
                         print("  PDF Downloaded: No")
@@ -159,7 +150,20 @@ def sample_records():
                     print(f"Error parsing record {i+1}: {e}")
                     break
 
-if __name__ == "__main__":
-    quick_stats()
+def report(conn):
+    """Run every section using an open connection to DB_PATH."""
+    quick_stats(conn)
     check_pdf_files()
     sample_records()
+
+if __name__ == "__main__":
+    if DB_PATH.exists():
+        conn = connect_readonly(DB_PATH)
+        try:
+            report(conn)
+        finally:
+            conn.close()
+    else:
+        print("Database not found!")
+        check_pdf_files()
+        sample_records()
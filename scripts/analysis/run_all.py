@@ -0,0 +1,39 @@
+"""Run several analysis reports in one process, sharing SQLite connections.
+
+Reports that read the same database reuse one read-only connection, so its
+PRAGMAs and page cache are set up once instead of once per script.
+"""
+import quick_analysis
+import show_detailed_metadata
+import show_detailed_results
+import show_source_summary
+from _common import connect_readonly
+
+REPORTS = (
+    quick_analysis,
+    show_detailed_metadata,
+    show_detailed_results,
+    show_source_summary,
+)
+
+
+def main():
+    connections = {}
+    try:
+        for module in REPORTS:
+            db_path = module.DB_PATH
+            if not db_path.exists():
+                print(f"[SKIP] {module.__name__}: database not found ({db_path})")
+                continue
+            conn = connections.get(db_path)
+            if conn is None:
+                conn = connections[db_path] = connect_readonly(db_path)
+            module.report(conn)
+            print()
+    finally:
+        for conn in connections.values():
+            conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,148 +1,169 @@
 """Show detailed results: PDF files and metadata samples"""
-import json
-import sqlite3
-from pathlib import Path
+import heapq
 from datetime import datetime
+from pathlib import Path
+
+from _common import connect_readonly, json_loads, list_pdfs
+
+DB_PATH = Path("data/test_paperscraper.sqlite")
+EXPORT_PATH = Path("data/paperscraper_export.jsonl")
+PDF_DIR = Path("data/paperscraper_pdfs")
 
-print("=" * 80)
-print("DETAILED TEST RESULTS - Paperscraper Integration")
-print("=" * 80)
-print(f"Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-
-db_path = Path("data/test_paperscraper.sqlite")
-export_path = Path("data/paperscraper_export.jsonl")
-pdf_dir = Path("data/paperscraper_pdfs")
-
-# 1. PDF Files Detail
-print("[1] PDF FILES DOWNLOADED")
-print("-" * 80)
-if pdf_dir.exists():
-    pdf_files = sorted(pdf_dir.glob("*.pdf"), key=lambda x: x.stat().st_size, reverse=True)
-    total_size_mb = sum(f.stat().st_size for f in pdf_files) / (1024 * 1024)
+
+def report(conn):
+    """Print the PDF and metadata results using an open connection to DB_PATH."""
+    print("=" * 80)
+    print("DETAILED TEST RESULTS - Paperscraper Integration")
+    print("=" * 80)
+    print(f"Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+
+    # 1. PDF Files Detail
+    print("[1] PDF FILES DOWNLOADED")
+    print("-" * 80)
+    if PDF_DIR.exists():
+        pdf_files = [(entry.name, entry.stat().st_size) for entry in list_pdfs(PDF_DIR)]
+        total_size_mb = sum(size for _, size in pdf_files) / (1024 * 1024)
     
-    print(f"Total PDF files: {len(pdf_files)}")
-    print(f"Total size: {total_size_mb:.2f} MB")
-    print(f"Average size: {total_size_mb/len(pdf_files):.2f} MB per file")
-    print(f"Location: {pdf_dir.absolute()}\n")
+        print(f"Total PDF files: {len(pdf_files)}")
+        print(f"Total size: {total_size_mb:.2f} MB")
+        print(f"Average size: {total_size_mb/len(pdf_files):.2f} MB per file")
+        print(f"Location: {PDF_DIR.absolute()}\n")
     
-    print("Top 15 largest PDF files:")
-    print(f"{'#':<4} {'Filename':<50} {'Size (MB)':>12}")
-    print("-" * 80)
-    for i, pdf_file in enumerate(pdf_files[:15], 1):
-        size_mb = pdf_file.stat().st_size / (1024 * 1024)
-        print(f"{i:<4} {pdf_file.name:<50} {size_mb:>12.2f}")
+        print("Top 15 largest PDF files:")
+        print(f"{'#':<4} {'Filename':<50} {'Size (MB)':>12}")
+        print("-" * 80)
+        largest = heapq.nlargest(15, pdf_files, key=lambda item: item[1])
+        for i, (name, size) in enumerate(largest, 1):
+            size_mb = size / (1024 * 1024)
+            print(f"{i:<4} {name:<50} {size_mb:>12.2f}")
     
-    if len(pdf_files) > 15:
-        print(f"\n... and {len(pdf_files) - 15} more files")
-else:
-    print(f"[PDF directory not found: {pdf_dir}]")
-
-# 2. Metadata Quality by Source
-print("\n[2] METADATA QUALITY BY SOURCE")
-print("-" * 80)
-conn = sqlite3.connect(db_path)
-cursor = conn.cursor()
-
-cursor.execute("""
-    SELECT 
-        source,
-        COUNT(*) as total,
-        SUM(CASE WHEN year IS NOT NULL THEN 1 ELSE 0 END) as with_year,
-        SUM(CASE WHEN abstract IS NOT NULL AND abstract != '' THEN 1 ELSE 0 END) as with_abstract,
-        SUM(CASE WHEN pdf_url IS NOT NULL AND pdf_url != '' THEN 1 ELSE 0 END) as with_pdf_url,
-        SUM(CASE WHEN doi IS NOT NULL AND doi != '' THEN 1 ELSE 0 END) as with_doi,
-        SUM(CASE WHEN local_path IS NOT NULL THEN 1 ELSE 0 END) as pdf_downloaded,
-        AVG(LENGTH(abstract)) as avg_abstract_length
-    FROM documents
-    GROUP BY source
-    ORDER BY source
-""")
-
-print(f"{'Source':<30} {'Total':>6} {'Year':>6} {'Abstract':>9} {'PDF URL':>8} {'DOI':>6} {'PDF':>6} {'Avg Abstract':>12}")
-print("-" * 80)
-for row in cursor.fetchall():
-    source, total, with_year, with_abstract, with_pdf_url, with_doi, pdf_downloaded, avg_abstract = row
-    if source == "paperscraper_pubmed":
-        source_display = "[PubMed]"
-    elif source == "paperscraper_arxiv":
-        source_display = "[arXiv]"
+        if len(pdf_files) > 15:
+            print(f"\n... and {len(pdf_files) - 15} more files")
     else:
-        source_display = f"[{source}]"
-    
-    avg_abstract_str = f"{avg_abstract:.0f} chars" if avg_abstract else "N/A"
-    print(f"{source_display:<30} {total:>6} {with_year:>6} {with_abstract:>9} {with_pdf_url:>8} {with_doi:>6} {pdf_downloaded:>6} {avg_abstract_str:>12}")
-
-# 3. Sample Records with PDFs
-print("\n[3] SAMPLE RECORDS WITH DOWNLOADED PDFs")
-print("-" * 80)
-cursor.execute("""
-    SELECT id, title, year, doi, source, local_path, file_size
-    FROM documents
-    WHERE local_path IS NOT NULL
-    ORDER BY id DESC
-    LIMIT 10
-""")
-
-print(f"{'ID':<6} {'Source':<20} {'Year':>6} {'File Size (MB)':>15} {'Title (first 50 chars)':<50}")
-print("-" * 80)
-for row in cursor.fetchall():
-    doc_id, title, year, doi, source, local_path, file_size = row
-    source_short = "PubMed" if source == "paperscraper_pubmed" else "arXiv"
-    size_mb = (file_size / (1024 * 1024)) if file_size else 0
-    title_short = title[:47] + "..." if title and len(title) > 50 else (title or "N/A")
-    print(f"{doc_id:<6} {source_short:<20} {year or 'N/A':>6} {size_mb:>15.2f} {title_short:<50}")
-
-# 4. Year Distribution
-print("\n[4] YEAR DISTRIBUTION")
-print("-" * 80)
-cursor.execute("""
-    SELECT year, COUNT(*) as cnt
-    FROM documents
-    WHERE year IS NOT NULL
-    GROUP BY year
-    ORDER BY year DESC
-    LIMIT 10
-""")
-
-print(f"{'Year':<8} {'Count':>8}")
-print("-" * 80)
-for year, count in cursor.fetchall():
-    print(f"{year:<8} {count:>8}")
-
-# 5. Export File Sample
-print("\n[5] EXPORT FILE SAMPLE")
-print("-" * 80)
-if export_path.exists():
-    with open(export_path, 'r', encoding='utf-8') as f:
-        records = [json.loads(line) for line in f if line.strip()]
+        print(f"[PDF directory not found: {PDF_DIR}]")
+
+    # 2. Metadata Quality by Source
+    print("\n[2] METADATA QUALITY BY SOURCE")
+    print("-" * 80)
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        SELECT 
+            source,
+            COUNT(*) as total,
+            SUM(CASE WHEN year IS NOT NULL THEN 1 ELSE 0 END) as with_year,
+            SUM(CASE WHEN abstract IS NOT NULL AND abstract != '' THEN 1 ELSE 0 END) as with_abstract,
+            SUM(CASE WHEN pdf_url IS NOT NULL AND pdf_url != '' THEN 1 ELSE 0 END) as with_pdf_url,
+            SUM(CASE WHEN doi IS NOT NULL AND doi != '' THEN 1 ELSE 0 END) as with_doi,
+            SUM(CASE WHEN local_path IS NOT NULL THEN 1 ELSE 0 END) as pdf_downloaded,
+            AVG(LENGTH(abstract)) as avg_abstract_length
+        FROM documents
+        GROUP BY source
+        ORDER BY source
+    """)
+
+    print(f"{'Source':<30} {'Total':>6} {'Year':>6} {'Abstract':>9} {'PDF URL':>8} {'DOI':>6} {'PDF':>6} {'Avg Abstract':>12}")
+    print("-" * 80)
+    for row in cursor.fetchall():
+        source, total, with_year, with_abstract, with_pdf_url, with_doi, pdf_downloaded, avg_abstract = row
+        if source == "paperscraper_pubmed":
+            source_display = "[PubMed]"
+        elif source == "paperscraper_arxiv":
+            source_display = "[arXiv]"
+        else:
+            source_display = f"[{source}]"
     
-    # Find a record with year and PDF
-    sample = None
-    for r in records:
-        if r.get('year') and r.get('pdf_url'):
-            sample = r
-            break
+        avg_abstract_str = f"{avg_abstract:.0f} chars" if avg_abstract else "N/A"
+        print(f"{source_display:<30} {total:>6} {with_year:>6} {with_abstract:>9} {with_pdf_url:>8} {with_doi:>6} {pdf_downloaded:>6} {avg_abstract_str:>12}")
+
+    # 3. Sample Records with PDFs
+    print("\n[3] SAMPLE RECORDS WITH DOWNLOADED PDFs")
+    print("-" * 80)
+    cursor.execute("""
+        SELECT COUNT(*), SUM(file_size), AVG(file_size)
+        FROM documents
+        WHERE local_path IS NOT NULL
+    """)
+    downloaded, downloaded_bytes, avg_bytes = cursor.fetchone()
+    if downloaded:
+        print(f"Downloaded per database: {downloaded} documents, "
+              f"{(downloaded_bytes or 0) / (1024 * 1024):.2f} MB total, "
+              f"{(avg_bytes or 0) / (1024 * 1024):.2f} MB average\n")
+
+    cursor.execute("""
+        SELECT id, title, year, doi, source, local_path, file_size
+        FROM documents
+        WHERE local_path IS NOT NULL
+        ORDER BY id DESC
+        LIMIT 10
+    """)
+
+    print(f"{'ID':<6} {'Source':<20} {'Year':>6} {'File Size (MB)':>15} {'Title (first 50 chars)':<50}")
+    print("-" * 80)
+    for row in cursor.fetchall():
+        doc_id, title, year, doi, source, local_path, file_size = row
+        source_short = "PubMed" if source == "paperscraper_pubmed" else "arXiv"
+        size_mb = (file_size / (1024 * 1024)) if file_size else 0
+        title_short = title[:47] + "..." if title and len(title) > 50 else (title or "N/A")
+        print(f"{doc_id:<6} {source_short:<20} {year or 'N/A':>6} {size_mb:>15.2f} {title_short:<50}")
+
+    # 4. Year Distribution
+    print("\n[4] YEAR DISTRIBUTION")
+    print("-" * 80)
+    cursor.execute("""
+        SELECT year, COUNT(*) as cnt
+        FROM documents
+        WHERE year IS NOT NULL
+        GROUP BY year
+        ORDER BY year DESC
+        LIMIT 10
+    """)
+
+    print(f"{'Year':<8} {'Count':>8}")
+    print("-" * 80)
+    for year, count in cursor.fetchall():
+        print(f"{year:<8} {count:>8}")
+
+    # 5. Export File Sample
+    print("\n[5] EXPORT FILE SAMPLE")
+    print("-" * 80)
+    if EXPORT_PATH.exists():
+        # Find a record with year and PDF, reading only as far as the first hit
+        sample = None
+        with open(EXPORT_PATH, 'rb') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                r = json_loads(line)
+                if r.get('year') and r.get('pdf_url'):
+                    sample = r
+                    break
     
-    if sample:
-        print("Sample record (with year and PDF URL):")
-        print(f"  ID: {sample.get('id')}")
-        print(f"  Source: {sample.get('source')}")
-        print(f"  Year: {sample.get('year')}")
-        print(f"  Title: {sample.get('title', '')[:70]}...")
-        print(f"  DOI: {sample.get('doi', 'N/A')}")
-        print(f"  PDF URL: {sample.get('pdf_url', 'N/A')[:70]}...")
-        print(f"  Abstract length: {len(sample.get('abstract', ''))} chars")
-        print(f"  PDF downloaded: {'Yes' if sample.get('local_path') else 'No'}")
-
-conn.close()
-
-print("\n" + "=" * 80)
-print("SUMMARY")
-print("=" * 80)
-print("All fixes verified:")
-print("  [OK] Year field extraction - working correctly")
-print("  [OK] Batch processing for arXiv - no more HTTP 500 errors")
-print("  [OK] PDF downloading - 40 PDFs downloaded successfully")
-print("  [OK] Metadata completeness - abstracts, DOIs, PDF URLs present")
-print("  [OK] Source identification - clear source labels in database")
+        if sample:
+            print("Sample record (with year and PDF URL):")
+            print(f"  ID: {sample.get('id')}")
+            print(f"  Source: {sample.get('source')}")
+            print(f"  Year: {sample.get('year')}")
+            print(f"  Title: {sample.get('title', '')[:70]}...")
+            print(f"  DOI: {sample.get('doi', 'N/A')}")
+            print(f"  PDF URL: {sample.get('pdf_url', 'N/A')[:70]}...")
+            print(f"  Abstract length: {len(sample.get('abstract', ''))} chars")
+            print(f"  PDF downloaded: {'Yes' if sample.get('local_path') else 'No'}")
+
+    print("\n" + "=" * 80)
+    print("SUMMARY")
+    print("=" * 80)
+    print("All fixes verified:")
+    print("  [OK] Year field extraction - working correctly")
+    print("  [OK] Batch processing for arXiv - no more HTTP 500 errors")
+    print("  [OK] PDF downloading - 40 PDFs downloaded successfully")
+    print("  [OK] Metadata completeness - abstracts, DOIs, PDF URLs present")
+    print("  [OK] Source identification - clear source labels in database")
+
 
+if __name__ == "__main__":
+    conn = connect_readonly(DB_PATH)
+    try:
+        report(conn)
+    finally:
+        conn.close()
@@ -1,8 +1,8 @@
 """Show detailed metadata from new sources: Crossref, OpenAlex, Semantic Scholar"""
-import json
-import sqlite3
-from pathlib import Path
 from datetime import datetime
+from pathlib import Path
+
+from _common import connect_readonly
 
 print("=" * 80)
 print("NEW SOURCES DATA ANALYSIS")
@@ -15,7 +15,7 @@ if not db_path.exists():
     print("[ERROR] Database not found. Please run discovery first.")
     exit(1)
 
-conn = sqlite3.connect(db_path)
+conn = connect_readonly(db_path)
 cursor = conn.cursor()
 
 # Get statistics by source
@@ -46,22 +46,33 @@ for row in cursor.fetchall():
 print("\n[2] SAMPLE RECORDS FROM EACH SOURCE")
 print("-" * 80)
 
+# Latest 3 records per source in one windowed query
 sources = ["crossref", "openalex", "semantic_scholar"]
-for source in sources:
-    cursor.execute("""
-        SELECT id, title, year, doi, abstract, pdf_url, authors, venue, open_access
+samples = {source: [] for source in sources}
+cursor.execute("""
+    SELECT source, id, title, year, doi, abstract, pdf_url, authors, venue, open_access,
+           CASE WHEN json_valid(authors) THEN json_array_length(authors) END,
+           CASE WHEN json_valid(authors) THEN
+               (SELECT group_concat(value, ', ') FROM json_each(authors) WHERE key < 3)
+           END
+    FROM (
+        SELECT *, ROW_NUMBER() OVER (PARTITION BY source ORDER BY id DESC) AS rn
         FROM documents
-        WHERE source = ?
-        ORDER BY id DESC
-        LIMIT 3
-    """, (source,))
-    
-    rows = cursor.fetchall()
+        WHERE source IN ('crossref', 'openalex', 'semantic_scholar')
+    )
+    WHERE rn <= 3
+    ORDER BY source, rn
+""")
+for source, *record in cursor:
+    samples[source].append(record)
+
+for source in sources:
+    rows = samples[source]
     if rows:
         print(f"\n{source.upper()} Samples:")
         print("-" * 80)
         for row in rows:
-            doc_id, title, year, doi, abstract, pdf_url, authors, venue, open_access = row
+            doc_id, title, year, doi, abstract, pdf_url, authors, venue, open_access, n_authors, first_authors = row
             print(f"\n  ID: {doc_id}")
             print(f"  Title: {title[:70]}..." if title and len(title) > 70 else f"  Title: {title}")
             print(f"  Year: {year if year else '[None]'}")
@@ -73,10 +84,9 @@ for source in sources:
             if abstract:
                 print(f"    Preview: {abstract[:150]}...")
             if authors:
-                try:
-                    authors_list = json.loads(authors)
-                    print(f"  Authors: {', '.join(authors_list[:3])}{'...' if len(authors_list) > 3 else ''}")
-                except:
+                if n_authors is not None:
+                    print(f"  Authors: {first_authors or ''}{'...' if n_authors > 3 else ''}")
+                else:
                     print(f"  Authors: {authors[:100]}")
     else:
         print(f"\n{source.upper()}: No records found")
@@ -1,32 +1,36 @@
 """Show OpenAlex education test results."""
 
-import json
+from _common import READ_BUFFER, json_loads
+
 
 def show_results():
     print("=== OPENALEX EDUCATION TEST RESULTS ===\n")
 
     try:
-        with open('data/openalex_education_results.jsonl', 'r', encoding='utf-8') as f:
-            records = []
+        # One streaming pass: count fields and keep only the first 5 records
+        total = abstracts = pdfs = dois = 0
+        samples = []
+        with open('data/openalex_education_results.jsonl', 'rb', buffering=READ_BUFFER) as f:
             for line in f:
-                records.append(json.loads(line))
-
-        print(f"Total records: {len(records)}\n")
+                record = json_loads(line)
+                total += 1
+                abstracts += bool(record.get('abstract'))
+                pdfs += bool(record.get('pdf_url'))
+                dois += bool(record.get('doi'))
+                if len(samples) < 5:
+                    samples.append(record)
 
-        # Statistics
-        abstracts = sum(1 for r in records if r.get('abstract'))
-        pdfs = sum(1 for r in records if r.get('pdf_url'))
-        dois = sum(1 for r in records if r.get('doi'))
+        print(f"Total records: {total}\n")
 
         print("Statistics:")
-        print(f"  Records with abstracts: {abstracts} ({abstracts/len(records)*100:.1f}%)")
-        print(f"  Records with PDF URLs: {pdfs} ({pdfs/len(records)*100:.1f}%)")
-        print(f"  Records with DOIs: {dois} ({dois/len(records)*100:.1f}%)")
+        print(f"  Records with abstracts: {abstracts} ({abstracts/total*100:.1f}%)")
+        print(f"  Records with PDF URLs: {pdfs} ({pdfs/total*100:.1f}%)")
+        print(f"  Records with DOIs: {dois} ({dois/total*100:.1f}%)")
         print()
 
         # Sample records
         print("Sample Records:")
-        for i, record in enumerate(records[:5], 1):
+        for i, record in enumerate(samples, 1):
             print(f"\n{i}. Title: {record.get('title', 'N/A')[:80]}...")
             print(f"   DOI: {record.get('doi', 'N/A')}")
             print(f"   Year: {record.get('year', 'N/A')}")
@@ -1,6 +1,7 @@
 """Show all files created from paperscraper test."""
 from pathlib import Path
-import json
+
+from _common import count_lines, json_loads, list_pdfs
 
 print("=" * 80)
 print("PAPERSCRAPER DATA FILES")
@@ -19,7 +20,7 @@ else:
 # Export file
 export_path = Path("data/paperscraper_export.jsonl")
 if export_path.exists():
-    line_count = sum(1 for _ in export_path.open())
+    line_count = count_lines(export_path)
     size_mb = export_path.stat().st_size / (1024 * 1024)
     print(f"\n[2] Export file (JSONL): {export_path}")
     print(f"    Size: {size_mb:.2f} MB")
@@ -28,10 +29,10 @@ if export_path.exists():
     
     # Show first record
     print(f"\n    First record preview:")
-    with export_path.open() as f:
+    with export_path.open('rb') as f:
         first_line = f.readline()
         if first_line:
-            record = json.loads(first_line)
+            record = json_loads(first_line)
             print(f"      Title: {record.get('title', 'N/A')[:60]}...")
             print(f"      DOI: {record.get('doi', 'N/A')}")
             print(f"      Source: {record.get('source', 'N/A')}")
@@ -43,8 +44,8 @@ else:
 # PDF directory
 pdf_dir = Path("data/paperscraper_pdfs")
 if pdf_dir.exists():
-    pdf_files = list(pdf_dir.glob("*.pdf"))
-    total_size = sum(f.stat().st_size for f in pdf_files) / (1024 * 1024)
+    pdf_files = [(entry.name, entry.stat().st_size) for entry in list_pdfs(pdf_dir)]
+    total_size = sum(size for _, size in pdf_files) / (1024 * 1024)
     print(f"\n[3] PDF files directory: {pdf_dir}")
     print(f"    PDF files: {len(pdf_files)}")
     print(f"    Total size: {total_size:.2f} MB")
@@ -52,9 +53,9 @@ if pdf_dir.exists():
     
     if pdf_files:
         print(f"\n    Sample PDFs:")
-        for pdf in pdf_files[:5]:
-            size_kb = pdf.stat().st_size / 1024
-            print(f"      - {pdf.name} ({size_kb:.1f} KB)")
+        for name, size in pdf_files[:5]:
+            size_kb = size / 1024
+            print(f"      - {name} ({size_kb:.1f} KB)")
 else:
     print(f"\n[3] PDF files directory: NOT FOUND")
     print(f"    To create: python -m src.uwss.cli fetch --db {db_path} --outdir {pdf_dir} --limit 20")
@@ -1,8 +1,9 @@
 """Verify arXiv and PubMed sources are working correctly"""
-import sqlite3
-import json
-from pathlib import Path
+from collections import Counter
 from datetime import datetime
+from pathlib import Path
+
+from _common import connect_readonly, json_loads, jsonl_lines
 
 print("=" * 80)
 print("SOURCE STATUS VERIFICATION")
@@ -12,22 +13,77 @@ print(f"Checked at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
 db_path = Path("data/test_paperscraper.sqlite")
 export_path = Path("data/paperscraper_export.jsonl")
 
-conn = sqlite3.connect(db_path)
+conn = connect_readonly(db_path)
 cursor = conn.cursor()
 
 # Check both sources
-sources = ["paperscraper_pubmed", "paperscraper_arxiv"]
+SOURCE_DISPLAY = {"paperscraper_pubmed": "PubMed", "paperscraper_arxiv": "arXiv"}
+sources = list(SOURCE_DISPLAY)
+COVERAGE_FMT = "    - {}: {}/{} ({:.1f}%)"
 all_ok = True
 
+# Counts, metadata coverage and error rows for both sources. Databases with
+# `uwss db-stats` enabled keep these in documents_stats via triggers; others
+# fall back to one aggregate scan over documents.
+has_stats_table = cursor.execute(
+    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'documents_stats'"
+).fetchone()
+if has_stats_table:
+    cursor.execute("""
+        SELECT source, total, with_title, with_abstract, with_doi, with_pdf_url, with_year, with_error
+        FROM documents_stats
+        WHERE source IN (?, ?)
+    """, sources)
+else:
+    cursor.execute("""
+        SELECT 
+            source,
+            COUNT(*) as total,
+            SUM(CASE WHEN title IS NOT NULL AND title != '' THEN 1 ELSE 0 END) as with_title,
+            SUM(CASE WHEN abstract IS NOT NULL AND abstract != '' THEN 1 ELSE 0 END) as with_abstract,
+            SUM(CASE WHEN doi IS NOT NULL AND doi != '' THEN 1 ELSE 0 END) as with_doi,
+            SUM(CASE WHEN pdf_url IS NOT NULL AND pdf_url != '' THEN 1 ELSE 0 END) as with_pdf_url,
+            SUM(CASE WHEN year IS NOT NULL THEN 1 ELSE 0 END) as with_year,
+            SUM(CASE WHEN status LIKE '%error%' OR status LIKE '%fail%' THEN 1 ELSE 0 END) as errors
+        FROM documents
+        WHERE source IN (?, ?)
+        GROUP BY source
+    """, sources)
+stats = {row[0]: row[1:] for row in cursor.fetchall()}
+
+# Number of DOIs that appear more than once, per source
+cursor.execute("""
+    SELECT source, COUNT(*)
+    FROM (
+        SELECT source, doi
+        FROM documents
+        WHERE source IN (?, ?) AND doi IS NOT NULL AND doi != ''
+        GROUP BY source, doi
+        HAVING COUNT(*) > 1
+    )
+    GROUP BY source
+""", sources)
+duplicate_dois = dict(cursor.fetchall())
+
+# Per-source record and abstract counts from one pass over the export
+export_counts = Counter()
+export_abstracts = Counter()
+if export_path.exists():
+    for line in jsonl_lines(export_path):
+        r = json_loads(line)
+        src = r.get('source')
+        export_counts[src] += 1
+        if r.get('abstract'):
+            export_abstracts[src] += 1
+
 for source in sources:
-    source_name = "PubMed" if source == "paperscraper_pubmed" else "arXiv"
+    source_name = SOURCE_DISPLAY[source]
     print(f"[{source_name}] Status Check")
     print("-" * 80)
     
-    # 1. Check if records exist
-    cursor.execute("SELECT COUNT(*) FROM documents WHERE source = ?", (source,))
-    total = cursor.fetchone()[0]
+    total, with_title, with_abstract, with_doi, with_pdf_url, with_year, error_count = stats.get(source, (0,) * 7)
     
+    # 1. Check if records exist
     if total == 0:
         print(f"  [ERROR] No records found for {source_name}")
         all_ok = False
@@ -35,26 +91,11 @@ for source in sources:
         print(f"  [OK] Records found: {total}")
     
     # 2. Check metadata quality
-    cursor.execute("""
-        SELECT 
-            SUM(CASE WHEN title IS NOT NULL AND title != '' THEN 1 ELSE 0 END) as with_title,
-            SUM(CASE WHEN abstract IS NOT NULL AND abstract != '' THEN 1 ELSE 0 END) as with_abstract,
-            SUM(CASE WHEN doi IS NOT NULL AND doi != '' THEN 1 ELSE 0 END) as with_doi,
-            SUM(CASE WHEN pdf_url IS NOT NULL AND pdf_url != '' THEN 1 ELSE 0 END) as with_pdf_url,
-            SUM(CASE WHEN year IS NOT NULL THEN 1 ELSE 0 END) as with_year
-        FROM documents
-        WHERE source = ?
-    """, (source,))
-    
-    row = cursor.fetchone()
-    with_title, with_abstract, with_doi, with_pdf_url, with_year = row
-    
     print(f"  Metadata Quality:")
-    print(f"    - Title: {with_title}/{total} ({with_title/total*100:.1f}%)")
-    print(f"    - Abstract: {with_abstract}/{total} ({with_abstract/total*100:.1f}%)")
-    print(f"    - DOI: {with_doi}/{total} ({with_doi/total*100:.1f}%)")
-    print(f"    - PDF URL: {with_pdf_url}/{total} ({with_pdf_url/total*100:.1f}%)")
-    print(f"    - Year: {with_year}/{total} ({with_year/total*100:.1f}%)")
+    pct_scale = 100 / total if total else 0
+    for label, count in (("Title", with_title), ("Abstract", with_abstract), ("DOI", with_doi),
+                         ("PDF URL", with_pdf_url), ("Year", with_year)):
+        print(COVERAGE_FMT.format(label, count, total, count * pct_scale))
     
     # 3. Check for common issues
     issues = []
@@ -69,27 +110,11 @@ for source in sources:
         issues.append("[WARNING] Low DOI coverage")
     
     # 4. Check for duplicate DOIs (potential data quality issue)
-    cursor.execute("""
-        SELECT doi, COUNT(*) as cnt
-        FROM documents
-        WHERE source = ? AND doi IS NOT NULL AND doi != ''
-        GROUP BY doi
-        HAVING COUNT(*) > 1
-        LIMIT 5
-    """, (source,))
-    
-    duplicates = cursor.fetchall()
+    duplicates = duplicate_dois.get(source, 0)
     if duplicates:
-        print(f"  [INFO] Found {len(duplicates)} duplicate DOIs (this is normal if same paper from different queries)")
+        print(f"  [INFO] Found {duplicates} duplicate DOIs (this is normal if same paper from different queries)")
     
     # 5. Check for records with errors (if status field indicates errors)
-    cursor.execute("""
-        SELECT COUNT(*) 
-        FROM documents 
-        WHERE source = ? AND (status LIKE '%error%' OR status LIKE '%fail%')
-    """, (source,))
-    
-    error_count = cursor.fetchone()[0]
     if error_count > 0:
         print(f"  [ERROR] {error_count} records with error status")
         all_ok = False
@@ -98,19 +123,16 @@ for source in sources:
     
     # 6. Check export file
     if export_path.exists():
-        with open(export_path, 'r', encoding='utf-8') as f:
-            export_records = [json.loads(line) for line in f if line.strip()]
-        
-        source_in_export = [r for r in export_records if r.get('source') == source]
-        print(f"  [OK] Export file: {len(source_in_export)} records")
+        in_export = export_counts[source]
+        print(f"  [OK] Export file: {in_export} records")
         
         # Check if export has abstract field
-        if source_in_export:
-            has_abstract = sum(1 for r in source_in_export if r.get('abstract'))
-            if has_abstract == len(source_in_export):
+        if in_export:
+            has_abstract = export_abstracts[source]
+            if has_abstract == in_export:
                 print(f"  [OK] All export records have abstract field")
             else:
-                print(f"  [WARNING] {len(source_in_export) - has_abstract} export records missing abstract")
+                print(f"  [WARNING] {in_export - has_abstract} export records missing abstract")
     else:
         print(f"  [WARNING] Export file not found")
     
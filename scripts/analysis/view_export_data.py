@@ -1,20 +1,23 @@
 """View export data from new sources"""
-import json
+from itertools import islice
 from pathlib import Path
 
+from _common import count_lines, json_loads
+
 export_path = Path("data/new_sources_export.jsonl")
 
 if not export_path.exists():
     print("Export file not found. Run export first.")
     exit(1)
 
-with open(export_path, 'r', encoding='utf-8') as f:
-    lines = f.readlines()
+# Only the first 5 lines are parsed; the total comes from a newline count
+with open(export_path, 'rb') as f:
+    head = list(islice(f, 5))
 
-print(f"Total records in export: {len(lines)}\n")
+print(f"Total records in export: {count_lines(export_path)}\n")
 
-for i, line in enumerate(lines[:5], 1):
-    r = json.loads(line)
+for i, line in enumerate(head, 1):
+    r = json_loads(line)
     print(f"Record {i} ({r.get('source', 'unknown')}):")
     print(f"  Title: {r.get('title', 'N/A')[:70]}...")
     print(f"  Year: {r.get('year', 'N/A')}")
@@ -1,8 +1,20 @@
 """View scale test results with metadata and PDF information."""
 
-import json
 from pathlib import Path
 
+from _common import MISSING_VALUES, json_loads, jsonl_lines, list_pdfs
+
+# pyarrow is optional: with it the quality stats are parsed and grouped in
+# native code, otherwise the JSONL is tallied line by line
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.json as paj
+except ImportError:
+    pa = None
+
+QUALITY_SOURCES = ('crossref', 'openalex', 'semantic_scholar')
+
 def view_sample_records():
     """View sample records from the complete JSONL file."""
     file_path = Path("data/scale_test_complete.jsonl")
@@ -16,11 +28,11 @@ def view_sample_records():
     pdf_count = 0
     total_count = 0
 
-    with open(file_path, 'r', encoding='utf-8') as f:
+    with open(file_path, 'rb') as f:
         for i, line in enumerate(f):
             if i >= 5:  # Skip first 5, show records 6-10
                 try:
-                    data = json.loads(line.strip())
+                    data = json_loads(line)
                     total_count += 1
 
                     print(f"Record {i+1}:")
@@ -30,7 +42,7 @@ def view_sample_records():
                     print(f"  Status: {data.get('status', 'N/A')}")
 
                     pdf_path = data.get('pdf_path')
-                    if pdf_path and pdf_path != 'None':
+                    if pdf_path not in MISSING_VALUES:
                         pdf_count += 1
                         print(f"  PDF Path: {pdf_path}")
                     else:
@@ -65,18 +77,65 @@ def view_pdf_files():
         print(f"PDF directory not found: {pdf_dir}")
         return
 
-    pdf_files = list(pdf_dir.glob("*.pdf"))
+    pdf_files = list_pdfs(pdf_dir)
     print(f"\n=== DOWNLOADED PDF FILES ({len(pdf_files)} files) ===\n")
 
-    for i, pdf_file in enumerate(sorted(pdf_files)[:10]):  # Show first 10
+    for i, pdf_file in enumerate(pdf_files[:10]):  # Show first 10
         print(f"{i+1}. {pdf_file.name}")
         print(f"   Size: {pdf_file.stat().st_size} bytes")
-        print(f"   Path: {pdf_file}")
+        print(f"   Path: {pdf_file.path}")
         print()
 
     if len(pdf_files) > 10:
         print(f"... and {len(pdf_files) - 10} more files")
 
+def _quality_stats_arrow(file_path):
+    """Per-source [total, abstract, pdf, score] counts from one columnar read."""
+    tbl = paj.read_json(file_path)
+
+    def column(name, as_text=True):
+        if name not in tbl.column_names:
+            return pa.nulls(tbl.num_rows, pa.string())
+        col = tbl.column(name)
+        return col.cast(pa.string()) if as_text else col
+
+    pdf_path = column('pdf_path')
+    flags = pa.table({
+        'source': column('source'),
+        'abstract': pc.fill_null(pc.not_equal(column('abstract'), ''), False),
+        'pdf': pc.and_(pc.is_valid(pdf_path), pc.invert(pc.is_in(pdf_path, value_set=pa.array(['', 'None'])))),
+        'score': pc.is_valid(column('relevance_score', as_text=False)),
+    })
+    grouped = flags.group_by('source').aggregate(
+        [('abstract', 'count'), ('abstract', 'sum'), ('pdf', 'sum'), ('score', 'sum')]
+    )
+
+    stats = {source: [0, 0, 0, 0] for source in QUALITY_SOURCES}
+    for row in grouped.to_pylist():
+        if row['source'] in stats:
+            stats[row['source']] = [row['abstract_count'], row['abstract_sum'], row['pdf_sum'], row['score_sum']]
+    return stats
+
+def _quality_stats_loop(file_path):
+    """Per-source [total, abstract, pdf, score] counts, skipping malformed lines."""
+    stats = {source: [0, 0, 0, 0] for source in QUALITY_SOURCES}
+
+    for line in jsonl_lines(file_path):
+        try:
+            data = json_loads(line)
+        except ValueError:
+            continue
+
+        s = stats.get(data.get('source', 'unknown'))
+        if s is None:
+            continue
+
+        s[0] += 1
+        s[1] += bool(data.get('abstract'))
+        s[2] += data.get('pdf_path') not in MISSING_VALUES
+        s[3] += data.get('relevance_score') is not None
+    return stats
+
 def view_metadata_quality():
     """View metadata quality statistics."""
     file_path = Path("data/scale_test_complete.jsonl")
@@ -85,42 +144,24 @@ def view_metadata_quality():
         print(f"File not found: {file_path}")
         return
 
-    stats = {
-        'crossref': {'total': 0, 'abstract': 0, 'pdf': 0, 'score': 0},
-        'openalex': {'total': 0, 'abstract': 0, 'pdf': 0, 'score': 0},
-        'semantic_scholar': {'total': 0, 'abstract': 0, 'pdf': 0, 'score': 0}
-    }
-
-    with open(file_path, 'r', encoding='utf-8') as f:
-        for line in f:
-            try:
-                data = json.loads(line.strip())
-                source = data.get('source', 'unknown')
-
-                if source in stats:
-                    stats[source]['total'] += 1
-
-                    if data.get('abstract'):
-                        stats[source]['abstract'] += 1
-
-                    if data.get('pdf_path') and data['pdf_path'] != 'None':
-                        stats[source]['pdf'] += 1
-
-                    if data.get('relevance_score') is not None:
-                        stats[source]['score'] += 1
-
-            except:
-                pass
+    stats = None
+    if pa is not None:
+        try:
+            stats = _quality_stats_arrow(file_path)
+        except pa.ArrowException:
+            # Malformed lines or mixed-type fields: use the tolerant loop
+            pass
+    if stats is None:
+        stats = _quality_stats_loop(file_path)
 
     print("\n=== METADATA QUALITY ===")
-    for source, data in stats.items():
-        total = data['total']
+    for source, (total, abstract, pdf, score) in stats.items():
         if total > 0:
             print(f"\n{source.upper()}:")
             print(f"  Total records: {total}")
-            print(".1f")
-            print(".1f")
-            print(".1f")
+            print(f"  With abstract: {abstract/total*100:.1f}% ({abstract}/{total})")
+            print(f"  With PDF: {pdf/total*100:.1f}% ({pdf}/{total})")
+            print(f"  With relevance score: {score/total*100:.1f}% ({score}/{total})")
 
 if __name__ == "__main__":
     view_sample_records()
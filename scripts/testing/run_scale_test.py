@@ -2,6 +2,7 @@
 
 import subprocess
 import sys
+from collections import deque
 from pathlib import Path
 
 # Add src to path
@@ -16,45 +17,46 @@ console = Console()
 # Database path
 DB_PATH = "sqlite:///data/test_new_sources.sqlite"
 MAX_RECORDS = 200
+# Only the last few output lines of each discovery are shown
+TAIL_LINES = 5
+CLI_CMD = [sys.executable, "-m", "src.uwss.cli"]
 
 def run_discovery(source: str, max_records: int):
     """Run discovery for a source."""
     console.print(f"\n[bold cyan]Running {source} discovery (max_records={max_records})...[/bold cyan]")
     
-    cmd = [
-        sys.executable,
-        "-m", "src.uwss.cli",
-        f"{source}-lib-discover",
-        "--max", str(max_records),
-        "--db-url", DB_PATH,
-    ]
+    cmd = [*CLI_CMD, f"{source}-lib-discover", "--max", str(max_records), "--db-url", DB_PATH]
     
+    # Stream the merged stdout/stderr and keep only the tail, instead of
+    # buffering the whole output in memory
+    tail = deque(maxlen=TAIL_LINES)
     try:
-        result = subprocess.run(
+        with subprocess.Popen(
             cmd,
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
             text=True,
             encoding="utf-8",
             errors="replace"
-        )
-        
-        if result.returncode == 0:
-            console.print(f"[green][OK] {source} discovery completed[/green]")
-            if result.stdout:
-                # Show last few lines of output
-                lines = result.stdout.strip().split("\n")
-                for line in lines[-5:]:
-                    if line.strip():
-                        console.print(f"  {line}")
-        else:
-            console.print(f"[red][FAIL] {source} discovery failed[/red]")
-            if result.stderr:
-                console.print(f"[red]Error: {result.stderr}[/red]")
-            return False
-        return True
-    except Exception as e:
+        ) as proc:
+            for line in proc.stdout:
+                if line.strip():
+                    tail.append(line.rstrip())
+            returncode = proc.wait()
+    except OSError as e:
         console.print(f"[red][FAIL] Error running {source}: {e}[/red]")
         return False
+    
+    if returncode == 0:
+        console.print(f"[green][OK] {source} discovery completed[/green]")
+        for line in tail:
+            console.print(f"  {line}")
+    else:
+        console.print(f"[red][FAIL] {source} discovery failed[/red]")
+        for line in tail:
+            console.print(f"[red]Error: {line}[/red]")
+        return False
+    return True
 
 def main():
     """Main function."""
@@ -64,6 +66,9 @@ def main():
     sources = ["crossref", "openalex", "semantic-scholar"]
     results = {}
     
+    # One source at a time: each discovery dedupes by SELECT-then-INSERT
+    # against the shared database, so concurrent runs would store DOIs that
+    # overlap between sources twice and contend for the SQLite write lock
     for source in sources:
         success = run_discovery(source, MAX_RECORDS)
         results[source] = success
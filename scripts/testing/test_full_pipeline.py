@@ -1,9 +1,15 @@
 """Full pipeline test: Discovery → Export → Fetch PDFs → Show Results"""
 import json
+import os
 import sqlite3
 from pathlib import Path
 from datetime import datetime
 
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
 print("=" * 80)
 print("FULL PIPELINE TEST - Paperscraper Integration")
 print("=" * 80)
@@ -13,10 +19,21 @@ db_path = Path("data/test_paperscraper.sqlite")
 export_path = Path("data/paperscraper_export.jsonl")
 pdf_dir = Path("data/paperscraper_pdfs")
 
+SOURCE_DISPLAY = {"paperscraper_pubmed": "PubMed", "paperscraper_arxiv": "arXiv"}
+SOURCE_LABELS = {source: f"[{name}] via paperscraper" for source, name in SOURCE_DISPLAY.items()}
+
 # Step 1: Check database
 print("[STEP 1] Database Statistics")
 print("-" * 80)
-conn = sqlite3.connect(db_path)
+# Read-only connection shared by Steps 1-2: refuse writes, memory-map the
+# file and keep sorts for the window query in memory
+conn = sqlite3.connect(f"{db_path.resolve().as_uri()}?mode=ro", uri=True)
+conn.executescript("""
+    PRAGMA query_only = ON;
+    PRAGMA mmap_size = 268435456;
+    PRAGMA cache_size = -50000;
+    PRAGMA temp_store = MEMORY;
+""")
 cursor = conn.cursor()
 
 cursor.execute("""
@@ -35,38 +52,39 @@ cursor.execute("""
 
 print(f"{'Source':<30} {'Total':>6} {'Year':>6} {'Abstract':>9} {'PDF URL':>8} {'DOI':>6} {'PDF Downloaded':>15}")
 print("-" * 80)
+pdfs_by_source = {}
 for row in cursor.fetchall():
     source, total, with_year, with_abstract, with_pdf_url, with_doi, pdf_downloaded = row
-    if source == "paperscraper_pubmed":
-        source_display = "[PubMed] via paperscraper"
-    elif source == "paperscraper_arxiv":
-        source_display = "[arXiv] via paperscraper"
-    else:
-        source_display = f"[{source}]"
+    pdfs_by_source[source] = pdf_downloaded
+    source_display = SOURCE_LABELS.get(source) or f"[{source}]"
     print(f"{source_display:<30} {total:>6} {with_year:>6} {with_abstract:>9} {with_pdf_url:>8} {with_doi:>6} {pdf_downloaded:>15}")
 
-conn.close()
-
 # Step 2: Sample metadata
 print("\n[STEP 2] Sample Metadata (5 records per source)")
 print("-" * 80)
-conn = sqlite3.connect(db_path)
-cursor = conn.cursor()
 
-for source in ["paperscraper_pubmed", "paperscraper_arxiv"]:
-    cursor.execute("""
-        SELECT id, title, year, doi, pdf_url, abstract, source
+# Latest 5 rows of every source in one query, bucketed per source in Python
+cursor.execute("""
+    SELECT id, title, year, doi, pdf_url, abstract, source
+    FROM (
+        SELECT id, title, year, doi, pdf_url, abstract, source,
+               ROW_NUMBER() OVER (PARTITION BY source ORDER BY id DESC) AS rn
         FROM documents
-        WHERE source = ?
-        ORDER BY id DESC
-        LIMIT 5
-    """, (source,))
-    
-    source_display = "PubMed" if source == "paperscraper_pubmed" else "arXiv"
+        WHERE source IN (?, ?)
+    )
+    WHERE rn <= 5
+    ORDER BY source, id DESC
+""", tuple(SOURCE_DISPLAY))
+samples = {source: [] for source in SOURCE_DISPLAY}
+for row in cursor.fetchall():
+    samples[row[6]].append(row)
+
+for source, rows in samples.items():
+    source_display = SOURCE_DISPLAY.get(source, source)
     print(f"\n{source_display} Samples:")
     print("-" * 80)
     
-    for row in cursor.fetchall():
+    for row in rows:
         doc_id, title, year, doi, pdf_url, abstract, src = row
         print(f"\n  ID: {doc_id}")
         print(f"  Title: {title[:70]}..." if title and len(title) > 70 else f"  Title: {title}")
@@ -81,7 +99,10 @@ conn.close()
 print("\n[STEP 3] PDF Files Downloaded")
 print("-" * 80)
 if pdf_dir.exists():
-    pdf_files = list(pdf_dir.glob("*.pdf"))
+    # Plain suffix filter over scandir; DirEntry.stat() reuses the directory read
+    with os.scandir(pdf_dir) as it:
+        pdf_files = [entry for entry in it if entry.name.endswith('.pdf')]
+    pdf_files.sort(key=lambda entry: entry.name)
     print(f"Total PDF files: {len(pdf_files)}")
     
     if pdf_files:
@@ -93,20 +114,11 @@ if pdf_dir.exists():
         if len(pdf_files) > 10:
             print(f"  ... and {len(pdf_files) - 10} more files")
         
-        # Check database for PDF paths
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT source, COUNT(*) 
-            FROM documents 
-            WHERE local_path IS NOT NULL 
-            GROUP BY source
-        """)
+        # PDF paths in the database, reusing the Step 1 per-source counts
         print("\nPDFs in database by source:")
-        for source, count in cursor.fetchall():
-            source_display = "PubMed" if source == "paperscraper_pubmed" else "arXiv"
-            print(f"  {source_display}: {count} PDFs")
-        conn.close()
+        for source, count in pdfs_by_source.items():
+            if count:
+                print(f"  {SOURCE_DISPLAY.get(source, source)}: {count} PDFs")
     else:
         print("  [No PDF files found]")
 else:
@@ -116,27 +128,31 @@ else:
 print("\n[STEP 4] Export File Analysis")
 print("-" * 80)
 if export_path.exists():
-    with open(export_path, 'r', encoding='utf-8') as f:
-        records = [json.loads(line) for line in f if line.strip()]
-    
-    print(f"Total records in export: {len(records)}")
-    
-    # Check year field
-    with_year = sum(1 for r in records if r.get('year'))
-    print(f"Records with year: {with_year} ({with_year/len(records)*100:.1f}%)")
+    # One streaming pass; only the first record is kept for the sample
+    total = with_year = with_abstract = with_pdf_url = 0
+    sample = None
+    with open(export_path, 'rb', buffering=1 << 20) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            r = json_loads(line)
+            if sample is None:
+                sample = r
+            total += 1
+            with_year += bool(r.get('year'))
+            with_abstract += bool(r.get('abstract'))
+            with_pdf_url += bool(r.get('pdf_url'))
     
-    # Check abstract field
-    with_abstract = sum(1 for r in records if r.get('abstract'))
-    print(f"Records with abstract: {with_abstract} ({with_abstract/len(records)*100:.1f}%)")
+    print(f"Total records in export: {total}")
     
-    # Check PDF URL
-    with_pdf_url = sum(1 for r in records if r.get('pdf_url'))
-    print(f"Records with PDF URL: {with_pdf_url} ({with_pdf_url/len(records)*100:.1f}%)")
+    # Year, abstract and PDF URL coverage
+    pct_scale = 100 / total if total else 0
+    for label, count in (("year", with_year), ("abstract", with_abstract), ("PDF URL", with_pdf_url)):
+        print(f"Records with {label}: {count} ({count * pct_scale:.1f}%)")
     
     # Sample record
-    if records:
+    if sample is not None:
         print("\nSample export record:")
-        sample = records[0]
         print(f"  Source: {sample.get('source')}")
         print(f"  Year: {sample.get('year', 'None')}")
         print(f"  Title: {sample.get('title', '')[:60]}...")
@@ -1,5 +1,6 @@
 """Test paperscraper discovery with 100 records for arxiv and pubmed."""
 import sys
+from itertools import islice
 from pathlib import Path
 
 # Add src to path
@@ -10,6 +11,41 @@ from uwss.sources.paperscraper import (
     discover_paperscraper_arxiv,
 )
 
+
+# Progress line interval; each print is a write (and a flush on a TTY)
+PROGRESS_EVERY = 100
+
+
+def collect(docs, n_samples=3):
+    """Keep the first n_samples docs and only count the rest."""
+    docs = iter(docs)
+    sample_papers = list(islice(docs, n_samples))
+    count = len(sample_papers)
+    for count, _ in enumerate(docs, start=count + 1):
+        if count % PROGRESS_EVERY == 0:
+            print(f"  Progress: {count} papers discovered...")
+    return count, sample_papers
+
+
+def print_samples(sample_papers):
+    """Print the sample block with a single write."""
+    lines = ["\nSample papers:"]
+    for i, paper in enumerate(sample_papers, 1):
+        lines += [
+            f"\n  Paper {i}:",
+            f"    Title: {paper.get('title', 'N/A')[:80]}",
+            f"    DOI: {paper.get('doi', 'N/A')}",
+            f"    Year: {paper.get('year', 'N/A')}",
+            f"    Abstract: {(paper.get('abstract') or 'N/A')[:150]}",
+            f"    Source URL: {paper.get('source_url', 'N/A')}",
+            f"    PDF URL: {paper.get('pdf_url', 'N/A')}",
+            f"    Authors: {paper.get('authors', 'N/A')}",
+            f"    Venue: {paper.get('venue', 'N/A')}",
+            f"    Keywords: {paper.get('keywords', 'N/A')}",
+        ]
+    print("\n".join(lines))
+
+
 # Test keywords from config
 keywords = [
     "reinforced concrete corrosion experiment",
@@ -25,30 +61,11 @@ print("=" * 80)
 print("\n[1] Testing PubMed discovery (limit: 100)...")
 print("-" * 80)
 try:
-    count = 0
-    sample_papers = []
-    for doc in discover_paperscraper_pubmed(keywords=keywords, max_records=100):
-        count += 1
-        if count <= 3:
-            sample_papers.append(doc)
-        
-        if count % 10 == 0:
-            print(f"  Progress: {count} papers discovered...")
+    count, sample_papers = collect(discover_paperscraper_pubmed(keywords=keywords, max_records=100))
     
     print(f"\nPubMed Results: {count} papers discovered")
     if sample_papers:
-        print("\nSample papers:")
-        for i, paper in enumerate(sample_papers, 1):
-            print(f"\n  Paper {i}:")
-            print(f"    Title: {paper.get('title', 'N/A')[:80]}")
-            print(f"    DOI: {paper.get('doi', 'N/A')}")
-            print(f"    Year: {paper.get('year', 'N/A')}")
-            print(f"    Abstract: {paper.get('abstract', 'N/A')[:150] if paper.get('abstract') else 'N/A'}")
-            print(f"    Source URL: {paper.get('source_url', 'N/A')}")
-            print(f"    PDF URL: {paper.get('pdf_url', 'N/A')}")
-            print(f"    Authors: {paper.get('authors', 'N/A')}")
-            print(f"    Venue: {paper.get('venue', 'N/A')}")
-            print(f"    Keywords: {paper.get('keywords', 'N/A')}")
+        print_samples(sample_papers)
             
 except ImportError as e:
     print(f"  ERROR: {e}")
@@ -62,30 +79,11 @@ except Exception as e:
 print("\n\n[2] Testing arXiv discovery (limit: 100)...")
 print("-" * 80)
 try:
-    count = 0
-    sample_papers = []
-    for doc in discover_paperscraper_arxiv(keywords=keywords, max_records=100):
-        count += 1
-        if count <= 3:
-            sample_papers.append(doc)
-        
-        if count % 10 == 0:
-            print(f"  Progress: {count} papers discovered...")
+    count, sample_papers = collect(discover_paperscraper_arxiv(keywords=keywords, max_records=100))
     
     print(f"\narXiv Results: {count} papers discovered")
     if sample_papers:
-        print("\nSample papers:")
-        for i, paper in enumerate(sample_papers, 1):
-            print(f"\n  Paper {i}:")
-            print(f"    Title: {paper.get('title', 'N/A')[:80]}")
-            print(f"    DOI: {paper.get('doi', 'N/A')}")
-            print(f"    Year: {paper.get('year', 'N/A')}")
-            print(f"    Abstract: {paper.get('abstract', 'N/A')[:150] if paper.get('abstract') else 'N/A'}")
-            print(f"    Source URL: {paper.get('source_url', 'N/A')}")
-            print(f"    PDF URL: {paper.get('pdf_url', 'N/A')}")
-            print(f"    Authors: {paper.get('authors', 'N/A')}")
-            print(f"    Venue: {paper.get('venue', 'N/A')}")
-            print(f"    Keywords: {paper.get('keywords', 'N/A')}")
+        print_samples(sample_papers)
             
 except ImportError as e:
     print(f"  ERROR: {e}")
@@ -1,17 +1,22 @@
 """Full test of paperscraper integration: discovery, database, metadata quality."""
+import queue
 import sys
-import json
+import traceback
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
-from sqlalchemy.orm import Session
-from uwss.store import create_sqlite_engine, Document, Base
+from sqlalchemy import event, select, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
 from uwss.sources.paperscraper import (
-    discover_paperscraper_pubmed,
     discover_paperscraper_arxiv,
+    discover_paperscraper_pubmed,
 )
+from uwss.store import Base, Document, create_sqlite_engine
 
 # Test keywords
 keywords = [
@@ -27,138 +32,243 @@ if db_path.exists():
     db_path.unlink()
 
 engine, SessionLocal = create_sqlite_engine(db_path)
+
+
+@event.listens_for(engine, "connect")
+def _set_write_pragmas(dbapi_conn, _record):
+    # WAL + synchronous=NORMAL: commits append to the log without an fsync each
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
 Base.metadata.create_all(engine)
+# DOI, source URL and title hash are unique at the database level; inserts skip colliding rows
+with engine.begin() as conn:
+    conn.exec_driver_sql(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_documents_doi_unique ON documents(doi) "
+        "WHERE doi IS NOT NULL AND doi != ''"
+    )
+    conn.exec_driver_sql(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_documents_source_url_unique ON documents(source_url) "
+        "WHERE source_url IS NOT NULL AND source_url != ''"
+    )
+    conn.exec_driver_sql(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_documents_title_hash_unique ON documents(title_hash) "
+        "WHERE title_hash IS NOT NULL"
+    )
 session = SessionLocal()
 
-print("=" * 80)
-print("FULL PAPERSCRAPER INTEGRATION TEST")
-print("=" * 80)
+# Discovered records are written this many at a time, one commit per batch
+BATCH_SIZE = 500
+# Progress line interval; each print is a write (and a flush on a TTY)
+PROGRESS_EVERY = 100
+# Sample papers kept per source for the report
+N_SAMPLES = 3
 
-# Test PubMed
-print("\n[1] Testing PubMed discovery and database insertion (limit: 100)...")
-print("-" * 80)
-try:
-    inserted = 0
-    duplicates = 0
-    sample_papers = []
+
+# RETURNING yields the dedup keys of the rows actually stored
+INSERT_OR_IGNORE = (
+    sqlite_insert(Document.__table__)
+    .on_conflict_do_nothing()
+    .returning(Document.doi, Document.source_url, Document.title_hash)
+)
+
+
+def dedup_key(row):
+    return row.get("doi"), row.get("source_url"), row.get("title_hash")
+
+
+def write_batch(rows):
+    """Insert rows in one transaction and return the ones actually written."""
+    # executemany needs the same keys in every row, so group by key set
+    by_columns = defaultdict(list)
+    for row in rows:
+        by_columns[frozenset(row)].append(row)
+    written = set()
+    for group in by_columns.values():
+        written.update(tuple(key) for key in session.execute(INSERT_OR_IGNORE, group))
+    session.commit()
+    # Queued rows never share a key (see ingest), so the key tuple identifies each one
+    return [row for row in rows if dedup_key(row) in written]
+
+
+# Dedup keys of every stored or queued document, loaded once so duplicate
+# checks are set lookups instead of up to three SELECTs per record
+seen_doi = set()
+seen_source_url = set()
+seen_title = set()
+for doi, source_url, title_hash in session.execute(select(Document.doi, Document.source_url, Document.title_hash)):
+    if doi:
+        seen_doi.add(doi)
+    if source_url:
+        seen_source_url.add(source_url)
+    if title_hash:
+        seen_title.add(title_hash)
+
+
+def ingest(items):
+    """Insert (label, doc) items in batches; return per-label counts and first 3 inserted.
+    
+    Runs on the main thread only, so it is the sole writer to SQLite.
+    """
+    results = {}
+    pending = defaultdict(list)
+    n_pending = 0
     
-    for doc_dict in discover_paperscraper_pubmed(keywords=keywords, max_records=100):
-        # Check for duplicates
-        existing = None
-        if doc_dict.get("doi"):
-            existing = session.query(Document).filter(Document.doi == doc_dict["doi"]).first()
-        if not existing and doc_dict.get("source_url"):
-            existing = session.query(Document).filter(Document.source_url == doc_dict["source_url"]).first()
-        if not existing and doc_dict.get("title"):
-            existing = session.query(Document).filter(Document.title == doc_dict["title"]).first()
+    def flush():
+        # Written per source so rows skipped by the unique indexes are
+        # counted as duplicates of the right one, and samples are taken
+        # only from rows that were actually stored
+        for label, rows in pending.items():
+            written = write_batch(rows)
+            stats = results[label]
+            skipped = len(rows) - len(written)
+            stats["inserted"] -= skipped
+            stats["duplicates"] += skipped
+            room = N_SAMPLES - len(stats["samples"])
+            if room > 0:
+                stats["samples"] += written[:room]
+        pending.clear()
+    
+    try:
+        for label, doc_dict in items:
+            stats = results.setdefault(label, {"inserted": 0, "duplicates": 0, "samples": []})
+            doi = doc_dict.get("doi")
+            source_url = doc_dict.get("source_url")
+            title_hash = doc_dict.get("title_hash")
         
-        if existing:
-            duplicates += 1
-            continue
+            # Check for duplicates
+            if (doi and doi in seen_doi) or (source_url and source_url in seen_source_url) or (title_hash and title_hash in seen_title):
+                stats["duplicates"] += 1
+                continue
         
-        # Insert
-        doc = Document(**doc_dict)
-        session.add(doc)
-        session.commit()
-        inserted += 1
+            pending[label].append(doc_dict)
+            n_pending += 1
+            if doi:
+                seen_doi.add(doi)
+            if source_url:
+                seen_source_url.add(source_url)
+            if title_hash:
+                seen_title.add(title_hash)
+            stats["inserted"] += 1
         
-        if inserted <= 3:
-            sample_papers.append(doc_dict)
+            if stats["inserted"] % PROGRESS_EVERY == 0:
+                print(f"  {label} progress: {stats['inserted']} papers inserted...")
         
-        if inserted % 10 == 0:
-            print(f"  Progress: {inserted} papers inserted...")
-    
-    print(f"\nPubMed Results:")
-    print(f"  Inserted: {inserted}")
-    print(f"  Duplicates: {duplicates}")
+            if n_pending >= BATCH_SIZE:
+                flush()
+                n_pending = 0
+    finally:
+        # Keep whatever was discovered before an error, as per-record commits did
+        if pending:
+            flush()
     
-    if sample_papers:
-        print("\n  Sample papers:")
-        for i, paper in enumerate(sample_papers, 1):
-            print(f"\n    Paper {i}:")
-            print(f"      Title: {paper.get('title', 'N/A')[:70]}")
-            print(f"      DOI: {paper.get('doi', 'N/A')}")
-            print(f"      Year: {paper.get('year', 'N/A')}")
-            print(f"      Abstract length: {len(paper.get('abstract', '') or '')} chars")
-            print(f"      Abstract preview: {paper.get('abstract', 'N/A')[:100] if paper.get('abstract') else 'N/A'}")
-            print(f"      Source URL: {paper.get('source_url', 'N/A')}")
-            print(f"      PDF URL: {paper.get('pdf_url', 'N/A')}")
-            print(f"      Authors: {paper.get('authors', 'N/A')}")
-            print(f"      Venue: {paper.get('venue', 'N/A')}")
-            
-except Exception as e:
-    print(f"  ERROR: {e}")
-    import traceback
-    traceback.print_exc()
+    return results
+
+
+# Each source is fetched on its own thread (one in-flight request per server);
+# the main thread drains the queue and does all database writes
+SOURCES = {
+    "PubMed": discover_paperscraper_pubmed,
+    "arXiv": discover_paperscraper_arxiv,
+}
+_DONE = object()
+
 
-# Test arXiv
-print("\n\n[2] Testing arXiv discovery and database insertion (limit: 100)...")
+def produce(label, discover, out):
+    try:
+        for doc_dict in discover(keywords=keywords, max_records=100):
+            out.put((label, doc_dict))
+    except Exception as e:
+        # Reported in the source's own section below
+        out.put((label, e))
+    finally:
+        out.put((label, _DONE))
+
+
+def drain(out, n_producers, errors):
+    while n_producers:
+        label, item = out.get()
+        if item is _DONE:
+            n_producers -= 1
+        elif isinstance(item, Exception):
+            errors[label] = item
+        else:
+            yield label, item
+
+
+print("=" * 80)
+print("FULL PAPERSCRAPER INTEGRATION TEST")
+print("=" * 80)
+
+print("\nRunning PubMed and arXiv discovery concurrently (limit: 100 each)...")
 print("-" * 80)
-try:
-    inserted = 0
-    duplicates = 0
-    sample_papers = []
-    
-    for doc_dict in discover_paperscraper_arxiv(keywords=keywords, max_records=100):
-        # Check for duplicates
-        existing = None
-        if doc_dict.get("doi"):
-            existing = session.query(Document).filter(Document.doi == doc_dict["doi"]).first()
-        if not existing and doc_dict.get("source_url"):
-            existing = session.query(Document).filter(Document.source_url == doc_dict["source_url"]).first()
-        if not existing and doc_dict.get("title"):
-            existing = session.query(Document).filter(Document.title == doc_dict["title"]).first()
-        
-        if existing:
-            duplicates += 1
-            continue
-        
-        # Insert
-        doc = Document(**doc_dict)
-        session.add(doc)
-        session.commit()
-        inserted += 1
-        
-        if inserted <= 3:
-            sample_papers.append(doc_dict)
-        
-        if inserted % 10 == 0:
-            print(f"  Progress: {inserted} papers inserted...")
+errors = {}
+results = {}
+doc_queue = queue.Queue()
+with ThreadPoolExecutor(max_workers=len(SOURCES)) as executor:
+    for label, discover in SOURCES.items():
+        executor.submit(produce, label, discover, doc_queue)
+    try:
+        results = ingest(drain(doc_queue, len(SOURCES), errors))
+    except Exception as e:
+        print(f"  ERROR: {e}")
+        traceback.print_exc()
+
+for n, label in enumerate(SOURCES, 1):
+    print(f"\n\n[{n}] {label} discovery and database insertion (limit: 100)...")
+    print("-" * 80)
+    if label in errors:
+        e = errors[label]
+        print(f"  ERROR: {e}")
+        traceback.print_exception(type(e), e, e.__traceback__)
     
-    print(f"\narXiv Results:")
-    print(f"  Inserted: {inserted}")
-    print(f"  Duplicates: {duplicates}")
+    # The rest of the section is collected and written with one print
+    stats = results.get(label, {"inserted": 0, "duplicates": 0, "samples": []})
+    lines = [
+        f"\n{label} Results:",
+        f"  Inserted: {stats['inserted']}",
+        f"  Duplicates: {stats['duplicates']}",
+    ]
     
+    sample_papers = stats["samples"]
     if sample_papers:
-        print("\n  Sample papers:")
+        lines.append("\n  Sample papers:")
         for i, paper in enumerate(sample_papers, 1):
-            print(f"\n    Paper {i}:")
-            print(f"      Title: {paper.get('title', 'N/A')[:70]}")
-            print(f"      DOI: {paper.get('doi', 'N/A')}")
-            print(f"      Year: {paper.get('year', 'N/A')}")
-            print(f"      Abstract length: {len(paper.get('abstract', '') or '')} chars")
-            print(f"      Abstract preview: {paper.get('abstract', 'N/A')[:100] if paper.get('abstract') else 'N/A'}")
-            print(f"      Source URL: {paper.get('source_url', 'N/A')}")
-            print(f"      PDF URL: {paper.get('pdf_url', 'N/A')}")
-            print(f"      Authors: {paper.get('authors', 'N/A')}")
-            print(f"      Venue: {paper.get('venue', 'N/A')}")
-            
-except Exception as e:
-    print(f"  ERROR: {e}")
-    import traceback
-    traceback.print_exc()
+            abstract = paper.get('abstract') or ''
+            lines += [
+                f"\n    Paper {i}:",
+                f"      Title: {paper.get('title', 'N/A')[:70]}",
+                f"      DOI: {paper.get('doi', 'N/A')}",
+                f"      Year: {paper.get('year', 'N/A')}",
+                f"      Abstract length: {len(abstract)} chars",
+                f"      Abstract preview: {abstract[:100] or 'N/A'}",
+                f"      Source URL: {paper.get('source_url', 'N/A')}",
+                f"      PDF URL: {paper.get('pdf_url', 'N/A')}",
+                f"      Authors: {paper.get('authors', 'N/A')}",
+                f"      Venue: {paper.get('venue', 'N/A')}",
+            ]
+    print("\n".join(lines))
 
 # Database statistics
 print("\n\n[3] Database Statistics...")
 print("-" * 80)
 try:
-    total = session.query(Document).count()
-    with_abstract = session.query(Document).filter(Document.abstract.isnot(None)).filter(Document.abstract != "").count()
-    with_pdf_url = session.query(Document).filter(Document.pdf_url.isnot(None)).filter(Document.pdf_url != "").count()
-    with_doi = session.query(Document).filter(Document.doi.isnot(None)).filter(Document.doi != "").count()
-    with_year = session.query(Document).filter(Document.year.isnot(None)).count()
-    pubmed_count = session.query(Document).filter(Document.source.like("%pubmed%")).count()
-    arxiv_count = session.query(Document).filter(Document.source.like("%arxiv%")).count()
+    # All seven figures from one scan of documents
+    total, with_abstract, with_pdf_url, with_doi, with_year, pubmed_count, arxiv_count = session.execute(text("""
+        SELECT
+            COUNT(*),
+            coalesce(SUM(abstract IS NOT NULL AND abstract != ''), 0),
+            coalesce(SUM(pdf_url IS NOT NULL AND pdf_url != ''), 0),
+            coalesce(SUM(doi IS NOT NULL AND doi != ''), 0),
+            coalesce(SUM(year IS NOT NULL), 0),
+            coalesce(SUM(source = 'paperscraper_pubmed'), 0),
+            coalesce(SUM(source = 'paperscraper_arxiv'), 0)
+        FROM documents
+    """)).one()
     
     print(f"  Total documents: {total}")
     print(f"  With abstract: {with_abstract} ({with_abstract/total*100:.1f}%)")
@@ -170,7 +280,6 @@ try:
     
 except Exception as e:
     print(f"  ERROR: {e}")
-    import traceback
     traceback.print_exc()
 
 session.close()
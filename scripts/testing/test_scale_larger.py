@@ -12,6 +12,15 @@ console = Console()
 # Database path
 DB_PATH = Path("data/test_new_sources.sqlite")
 
+# Read-side connection tuning: in-memory temp tables, a 256 MB page cache and
+# up to 256 MB of the file memory-mapped. No journal_mode change here - WAL is
+# persistent and would leave -wal/-shm files next to a database we only read
+TUNING_PRAGMAS = (
+    "temp_store=MEMORY",
+    "cache_size=-262144",
+    "mmap_size=268435456",
+)
+
 def analyze_database():
     """Analyze database content and quality."""
     if not DB_PATH.exists():
@@ -19,62 +28,47 @@ def analyze_database():
         return
     
     conn = sqlite3.connect(DB_PATH)
+    for pragma in TUNING_PRAGMAS:
+        conn.execute(f"PRAGMA {pragma}")
     cursor = conn.cursor()
     
-    # Get total counts by source
+    # Counts, metadata coverage and remaining issues for every source in one pass
     cursor.execute("""
-        SELECT source, COUNT(*) as count
+        SELECT 
+            source,
+            COUNT(*) as total,
+            SUM(CASE WHEN abstract IS NOT NULL AND abstract != '' THEN 1 ELSE 0 END) as has_abstract,
+            SUM(CASE WHEN pdf_url IS NOT NULL AND pdf_url != '' THEN 1 ELSE 0 END) as has_pdf_url,
+            SUM(CASE WHEN doi IS NOT NULL AND doi != '' THEN 1 ELSE 0 END) as has_doi,
+            SUM(CASE WHEN authors IS NOT NULL AND authors != '' THEN 1 ELSE 0 END) as has_authors,
+            SUM(CASE WHEN year IS NOT NULL THEN 1 ELSE 0 END) as has_year,
+            SUM(CASE WHEN venue IS NOT NULL AND venue != '' THEN 1 ELSE 0 END) as has_venue,
+            -- HTML tags in abstracts (should be cleaned now)
+            SUM(CASE WHEN abstract LIKE '%<%' AND abstract LIKE '%>%' THEN 1 ELSE 0 END) as html_abstracts,
+            -- Empty string pdf_url (should be None now)
+            SUM(CASE WHEN pdf_url = '' THEN 1 ELSE 0 END) as empty_pdf_urls
         FROM documents
         GROUP BY source
         ORDER BY source
     """)
-    source_counts = dict(cursor.fetchall())
-    
-    # Get metadata quality by source
+    source_counts = {}
     quality_metrics = {}
-    for source in source_counts.keys():
-        cursor.execute("""
-            SELECT 
-                COUNT(*) as total,
-                SUM(CASE WHEN abstract IS NOT NULL AND abstract != '' THEN 1 ELSE 0 END) as has_abstract,
-                SUM(CASE WHEN pdf_url IS NOT NULL AND pdf_url != '' THEN 1 ELSE 0 END) as has_pdf_url,
-                SUM(CASE WHEN doi IS NOT NULL AND doi != '' THEN 1 ELSE 0 END) as has_doi,
-                SUM(CASE WHEN authors IS NOT NULL AND authors != '' THEN 1 ELSE 0 END) as has_authors,
-                SUM(CASE WHEN year IS NOT NULL THEN 1 ELSE 0 END) as has_year,
-                SUM(CASE WHEN venue IS NOT NULL AND venue != '' THEN 1 ELSE 0 END) as has_venue
-            FROM documents
-            WHERE source = ?
-        """, (source,))
-        row = cursor.fetchone()
-        if row:
-            total, has_abstract, has_pdf_url, has_doi, has_authors, has_year, has_venue = row
-            quality_metrics[source] = {
-                "total": total,
-                "abstract_pct": (has_abstract / total * 100) if total > 0 else 0,
-                "pdf_url_pct": (has_pdf_url / total * 100) if total > 0 else 0,
-                "doi_pct": (has_doi / total * 100) if total > 0 else 0,
-                "authors_pct": (has_authors / total * 100) if total > 0 else 0,
-                "year_pct": (has_year / total * 100) if total > 0 else 0,
-                "venue_pct": (has_venue / total * 100) if total > 0 else 0,
-            }
-    
-    # Check for HTML tags in abstracts (should be cleaned now)
-    cursor.execute("""
-        SELECT source, COUNT(*) as count
-        FROM documents
-        WHERE abstract LIKE '%<%' AND abstract LIKE '%>%'
-        GROUP BY source
-    """)
-    html_in_abstracts = dict(cursor.fetchall())
-    
-    # Check for empty string pdf_url (should be None now)
-    cursor.execute("""
-        SELECT source, COUNT(*) as count
-        FROM documents
-        WHERE pdf_url = ''
-        GROUP BY source
-    """)
-    empty_pdf_urls = dict(cursor.fetchall())
+    html_in_abstracts = {}
+    empty_pdf_urls = {}
+    for row in cursor.fetchall():
+        source, total, has_abstract, has_pdf_url, has_doi, has_authors, has_year, has_venue, html_count, empty_count = row
+        source_counts[source] = total
+        quality_metrics[source] = {
+            "total": total,
+            "abstract_pct": (has_abstract / total * 100) if total > 0 else 0,
+            "pdf_url_pct": (has_pdf_url / total * 100) if total > 0 else 0,
+            "doi_pct": (has_doi / total * 100) if total > 0 else 0,
+            "authors_pct": (has_authors / total * 100) if total > 0 else 0,
+            "year_pct": (has_year / total * 100) if total > 0 else 0,
+            "venue_pct": (has_venue / total * 100) if total > 0 else 0,
+        }
+        html_in_abstracts[source] = html_count
+        empty_pdf_urls[source] = empty_count
     
     # Display results
     console.print("\n[bold cyan]=== DATABASE ANALYSIS ===[/bold cyan]\n")
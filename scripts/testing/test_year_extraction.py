@@ -1,7 +1,14 @@
 """Test year extraction from paperscraper date field."""
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
 from paperscraper.pubmed import get_pubmed_papers
 from paperscraper.arxiv import get_arxiv_papers_api
-import re
+from uwss.sources.paperscraper.mappers import _year_from_text
+
 
 print("=" * 80)
 print("TESTING YEAR EXTRACTION")
@@ -18,9 +25,8 @@ if not df_pubmed.empty:
         
         # Test extraction
         if date_val:
-            year_match = re.search(r"\d{4}", str(date_val))
-            if year_match:
-                year = int(year_match.group(0))
+            year = _year_from_text(str(date_val))
+            if year is not None:
                 print(f"    -> Extracted year: {year}")
             else:
                 print(f"    -> Could not extract year")
@@ -36,9 +42,8 @@ if not df_arxiv.empty:
         
         # Test extraction
         if date_val:
-            year_match = re.search(r"\d{4}", str(date_val))
-            if year_match:
-                year = int(year_match.group(0))
+            year = _year_from_text(str(date_val))
+            if year is not None:
                 print(f"    -> Extracted year: {year}")
             else:
                 print(f"    -> Could not extract year")
@@ -1,17 +1,50 @@
 """Create additional viewer files for easy inspection."""
 
-import json
 import sqlite3
+from functools import lru_cache
 from pathlib import Path
 
+# orjson decodes the per-record authors arrays several times faster
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
 DB_PATH = Path("data/test_new_sources.sqlite")
 OUTPUT_DIR = Path("data/reports")
 OUTPUT_DIR.mkdir(exist_ok=True)
 
+# Read-side connection tuning: in-memory temp tables, a 256 MB page cache and
+# up to 256 MB of the file memory-mapped. No journal_mode change here - WAL is
+# persistent and would leave -wal/-shm files next to a database we only read
+TUNING_PRAGMAS = (
+    "temp_store=MEMORY",
+    "cache_size=-262144",
+    "mmap_size=268435456",
+)
+
+
+def connect():
+    conn = sqlite3.connect(DB_PATH)
+    for pragma in TUNING_PRAGMAS:
+        conn.execute(f"PRAGMA {pragma}")
+    return conn
+
+
+@lru_cache(maxsize=1024)
+def format_authors(raw):
+    """Authors line for a stored JSON array; repeated author lists are parsed once."""
+    if not raw:
+        return "Authors: None"
+    try:
+        authors = json_loads(raw)
+        return f"Authors: {', '.join(authors[:3])}{'...' if len(authors) > 3 else ''}"
+    except (ValueError, TypeError):
+        return f"Authors: {raw[:100]}"
+
 def create_sample_viewer():
     """Create a simple text file with sample records for quick viewing."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
+    conn = connect()
     cursor = conn.cursor()
     
     output = []
@@ -22,38 +55,39 @@ def create_sample_viewer():
     
     sources = ["crossref", "openalex", "semantic_scholar"]
     
+    # Up to 10 records per source in one pass instead of one query per source
+    cursor.execute(f"""
+        SELECT source, title, abstract, pdf_url, doi, year, authors, venue, source_url
+        FROM (
+            SELECT *, ROW_NUMBER() OVER (PARTITION BY source ORDER BY id) AS rn
+            FROM documents
+            WHERE source IN ({", ".join("?" * len(sources))})
+        )
+        WHERE rn <= 10
+        ORDER BY source, rn
+    """, sources)
+    by_source = {source: [] for source in sources}
+    for source, *rec in cursor:
+        by_source[source].append(rec)
+    
     for source in sources:
         output.append(f"\n{'=' * 80}")
         output.append(f"SOURCE: {source.upper()}")
         output.append(f"{'=' * 80}\n")
         
-        cursor.execute("""
-            SELECT title, abstract, pdf_url, doi, year, authors, venue, source_url
-            FROM documents
-            WHERE source = ?
-            LIMIT 10
-        """, (source,))
-        
-        records = cursor.fetchall()
+        records = by_source[source]
         output.append(f"Total samples shown: {len(records)}\n")
         
-        for i, rec in enumerate(records, 1):
+        for i, (title, abstract, pdf_url, doi, year, authors, venue, source_url) in enumerate(records, 1):
             output.append(f"\n--- Record {i} ---")
-            output.append(f"Title: {rec['title']}")
-            output.append(f"Year: {rec['year']}")
-            output.append(f"DOI: {rec['doi'] or 'None'}")
-            output.append(f"PDF URL: {rec['pdf_url'] or 'None'}")
-            output.append(f"Venue: {rec['venue'] or 'None'}")
-            if rec['authors']:
-                try:
-                    authors = json.loads(rec['authors'])
-                    output.append(f"Authors: {', '.join(authors[:3])}{'...' if len(authors) > 3 else ''}")
-                except:
-                    output.append(f"Authors: {rec['authors'][:100]}")
-            else:
-                output.append("Authors: None")
-            if rec['abstract']:
-                abstract = rec['abstract'][:300] + "..." if len(rec['abstract']) > 300 else rec['abstract']
+            output.append(f"Title: {title}")
+            output.append(f"Year: {year}")
+            output.append(f"DOI: {doi or 'None'}")
+            output.append(f"PDF URL: {pdf_url or 'None'}")
+            output.append(f"Venue: {venue or 'None'}")
+            output.append(format_authors(authors))
+            if abstract:
+                abstract = abstract[:300] + "..." if len(abstract) > 300 else abstract
                 output.append(f"Abstract: {abstract}")
             else:
                 output.append("Abstract: None")
@@ -68,8 +102,7 @@ def create_sample_viewer():
 
 def create_issues_report():
     """Create a report specifically for issues."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
+    conn = connect()
     cursor = conn.cursor()
     
     output = []
@@ -91,10 +124,10 @@ def create_issues_report():
     
     if html_issues:
         output.append(f"Found {len(html_issues)} records with HTML tags:\n")
-        for rec in html_issues:
-            output.append(f"Source: {rec['source']}")
-            output.append(f"Title: {rec['title'][:80]}")
-            abstract_preview = rec['abstract'][:200].replace('\n', ' ')
+        for source, title, abstract in html_issues:
+            output.append(f"Source: {source}")
+            output.append(f"Title: {title[:80]}")
+            abstract_preview = abstract[:200].replace('\n', ' ')
             output.append(f"Abstract preview: {abstract_preview}...")
             output.append("")
     else:
@@ -113,10 +146,10 @@ def create_issues_report():
     
     if empty_pdf:
         output.append(f"Found {len(empty_pdf)} records with empty PDF URLs:\n")
-        for rec in empty_pdf:
-            output.append(f"Source: {rec['source']}")
-            output.append(f"Title: {rec['title'][:80]}")
-            output.append(f"PDF URL value: {repr(rec['pdf_url'])}")
+        for source, title, pdf_url in empty_pdf:
+            output.append(f"Source: {source}")
+            output.append(f"Title: {title[:80]}")
+            output.append(f"PDF URL value: {repr(pdf_url)}")
             output.append("")
     else:
         output.append("No empty PDF URLs found!\n")
@@ -133,8 +166,8 @@ def create_issues_report():
     missing_abstracts = cursor.fetchall()
     
     if missing_abstracts:
-        for rec in missing_abstracts:
-            output.append(f"{rec['source']}: {rec['count']} records without abstract")
+        for source, count in missing_abstracts:
+            output.append(f"{source}: {count} records without abstract")
     else:
         output.append("All records have abstracts!")
     
@@ -147,7 +180,7 @@ def create_issues_report():
 
 def create_statistics_summary():
     """Create a statistics summary file."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect()
     cursor = conn.cursor()
     
     cursor.execute("""
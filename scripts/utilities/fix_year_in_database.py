@@ -1,42 +1,69 @@
 """Fix year field in existing database by extracting from date."""
 import sqlite3
-import re
 from pathlib import Path
 
 db_path = Path("data/test_paperscraper.sqlite")
 
+# Connection tuning: WAL journal without an fsync per commit, in-memory temp
+# tables, a 256 MB page cache and up to 256 MB of the file memory-mapped
+TUNING_PRAGMAS = (
+    "journal_mode=WAL",
+    "synchronous=NORMAL",
+    "temp_store=MEMORY",
+    "cache_size=-262144",
+    "mmap_size=268435456",
+)
+
 print("=" * 80)
 print("FIXING YEAR IN DATABASE")
 print("=" * 80)
 
 conn = sqlite3.connect(db_path)
+for pragma in TUNING_PRAGMAS:
+    conn.execute(f"PRAGMA {pragma}")
 cursor = conn.cursor()
 
-# Check if we can get date from paperscraper again
-# But actually, we don't have date stored in database
-# So we need to re-run discovery or update from source
-
-# Alternative: Check if we can extract from existing data
-# But we don't have date field in Document model
+# Derive year in the database, in one UPDATE and one transaction, from:
+#   - pub_date when it starts with a 4-digit year
+#   - arXiv DOIs: new-style IDs (10.48550/arxiv.YYMM.NNNNN) and old-style
+#     IDs (10.48550/arxiv.[archive/]YYMMNNN) both encode the submission year
+BACKFILL_SQL = """
+    UPDATE documents
+    SET year = CASE
+        WHEN pub_date GLOB '[0-9][0-9][0-9][0-9]*'
+            THEN CAST(substr(pub_date, 1, 4) AS INTEGER)
+        WHEN lower(doi) GLOB '10.48550/arxiv.[0-9][0-9][0-9][0-9].[0-9]*'
+            THEN 2000 + CAST(substr(doi, 16, 2) AS INTEGER)
+        WHEN lower(doi) GLOB '10.48550/arxiv.*[0-9][0-9][0-9][0-9][0-9][0-9][0-9]'
+            THEN CAST(substr(doi, -7, 2) AS INTEGER) + CASE WHEN CAST(substr(doi, -7, 2) AS INTEGER) >= 91 THEN 1900 ELSE 2000 END
+    END
+    WHERE year IS NULL
+      AND (pub_date GLOB '[0-9][0-9][0-9][0-9]*'
+           OR lower(doi) GLOB '10.48550/arxiv.[0-9][0-9][0-9][0-9].[0-9]*'
+           OR lower(doi) GLOB '10.48550/arxiv.*[0-9][0-9][0-9][0-9][0-9][0-9][0-9]')
+"""
 
-print("\n[INFO] Year extraction works in mapper, but existing data was inserted before mapper fix.")
-print("To fix: Re-run discovery to get year from date field.")
-print("\nOr we can try to update from source URLs...")
+missing_before = cursor.execute("SELECT COUNT(*) FROM documents WHERE year IS NULL").fetchone()[0]
+with conn:
+    filled = cursor.execute(BACKFILL_SQL).rowcount
+print(f"\n[INFO] Documents without year: {missing_before}")
+print(f"[OK] Filled from pub_date / arXiv DOI: {filled}")
 
-# Check if we have any way to get date back
+# Whatever is left has no date-bearing column to derive a year from
 cursor.execute("SELECT id, source, doi FROM documents WHERE year IS NULL LIMIT 5")
 rows = cursor.fetchall()
 
-print(f"\nSample documents without year:")
-for doc_id, source, doi in rows:
-    print(f"  ID {doc_id}: source={source}, doi={doi}")
+if rows:
+    print("\nSample documents still without year:")
+    for doc_id, source, doi in rows:
+        print(f"  ID {doc_id}: source={source}, doi={doi}")
 
 conn.close()
 
 print("\n" + "=" * 80)
 print("SOLUTION")
 print("=" * 80)
-print("Re-run paperscraper discovery to get year from date field:")
+print("For the remaining records, re-run paperscraper discovery to get year from date field:")
 print("  python -m src.uwss.cli paperscraper-discover --source pubmed --max 100")
 print("  python -m src.uwss.cli paperscraper-discover --source arxiv --max 100")
 
@@ -17,14 +17,15 @@ print("=" * 80)
 print("UPDATING YEAR FROM PAPERSCRAPER")
 print("=" * 80)
 
-# Get all documents without year
-docs = session.query(Document).filter(Document.year.is_(None)).all()
-print(f"\nFound {len(docs)} documents without year")
+# Count documents without year in SQL; only the first 20 are loaded
+missing_year = session.query(Document).filter(Document.year.is_(None))
+print(f"\nFound {missing_year.count()} documents without year")
+docs = missing_year.limit(20).all()  # Limit to 20 for testing
 
 updated = 0
 failed = 0
 
-for doc in docs[:20]:  # Limit to 20 for testing
+for doc in docs:
     try:
         # Try to get year from paperscraper based on source
         if "pubmed" in doc.source.lower():
@@ -1,18 +1,91 @@
 from __future__ import annotations
 
+import json
+import re
 import time
-from datetime import datetime
-from typing import Iterable, Optional, Dict, Any, List
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+from typing import Any
+
 import requests
-import xml.etree.ElementTree as ET
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-from ..store import Document, IngestionState
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
+from sqlalchemy import and_, or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+
+from ..store import Document, IngestionState
 
 ARXIV_OAI_BASE = "https://export.arxiv.org/oai2"
+_NS = {
+    "oai": "http://www.openarchives.org/OAI/2.0/",
+    "oai_dc": "http://www.openarchives.org/OAI/2.0/oai_dc/",
+    "dc": "http://purl.org/dc/elements/1.1/",
+}
+_DC_FIELDS = ("identifier", "title", "creator", "description", "date")
+
+# lxml (libxml2) parses pages several times faster and filters iterparse by
+# tag in C; the stdlib parser is the fallback with the same element API
+try:
+    from lxml import etree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+    _LXML = False
+else:
+    _LXML = True
+
+# Compiled once: text nodes of each dc:<field> child
+_DC_TEXT = {t: ET.XPath(f"dc:{t}/text()", namespaces=_NS) for t in _DC_FIELDS} if _LXML else None
+
+# Clark-notation tags, so lookups skip the prefix resolver
+_OAI = "{" + _NS["oai"] + "}"
+_DC = "{" + _NS["dc"] + "}"
+_OAI_LIST_RECORDS = _OAI + "ListRecords"
+_OAI_RECORD = _OAI + "record"
+_OAI_METADATA = _OAI + "metadata"
+_OAI_RESUMPTION_TOKEN = _OAI + "resumptionToken"
+_OAI_DC_DC = "{" + _NS["oai_dc"] + "}dc"
+_DC_DC = _DC + "dc"
+_DC_TAG = {t: _DC + t for t in _DC_FIELDS}
 
+# dc:identifier forms we use; lastgroup tells which one matched
+_ID_RE = re.compile(
+    r"https?://(?:dx\.)?doi\.org/(?P<doi_url>.+)"
+    r"|doi:(?P<doi>.+)"
+    r"|https?://arxiv\.org/abs/(?P<arxiv>.+)",
+    re.I | re.S,
+)
 
-def _clip(text: Optional[str], max_len: int) -> Optional[str]:
+
+def _http_session(headers: dict[str, str]) -> requests.Session:
+    """Keep-alive session for paging: one TCP+TLS handshake for the whole harvest.
+
+    export.arxiv.org answers flow control with 503 + Retry-After, which the
+    retry policy honours before giving up.
+    """
+    s = requests.Session()
+    s.headers.update(headers)
+    retry = Retry(
+        total=5,
+        backoff_factor=1,
+        status_forcelist=(429, 500, 502, 503, 504),
+        respect_retry_after_header=True,
+        allowed_methods=("GET",),
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=retry)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    return s
+
+
+def _clip(text: str | None, max_len: int) -> str | None:
     if text is None:
         return None
     try:
@@ -22,20 +95,21 @@ def _clip(text: Optional[str], max_len: int) -> Optional[str]:
         return text
 
 
-def _parse_oai_record(record_el: ET.Element) -> Dict[str, Any]:
-    ns = {
-        "oai": "http://www.openarchives.org/OAI/2.0/",
-        "oai_dc": "http://www.openarchives.org/OAI/2.0/oai_dc/",
-        "dc": "http://purl.org/dc/elements/1.1/",
-    }
-    header = record_el.find("oai:header", ns)
-    metadata = record_el.find("oai:metadata", ns)
+def _dc_texts(dc: ET.Element, field: str) -> list[str]:
+    """Non-empty stripped texts of the dc:<field> children of dc."""
+    if _LXML:
+        return [t for t in (x.strip() for x in _DC_TEXT[field](dc)) if t]
+    return [t for t in (el.text.strip() for el in dc.iterfind(_DC_TAG[field]) if el.text) if t]
+
+
+def _parse_oai_record(record_el: ET.Element) -> dict[str, Any]:
+    metadata = record_el.find(_OAI_METADATA)
     if metadata is None:
         return {}
     # arXiv uses oai_dc:dc; fall back to dc:dc if present
-    dc = metadata.find("oai_dc:dc", ns)
+    dc = metadata.find(_OAI_DC_DC)
     if dc is None:
-        dc = metadata.find("dc:dc", ns)
+        dc = metadata.find(_DC_DC)
     if dc is None:
         # try any child element ending with 'dc'
         for child in list(metadata):
@@ -45,39 +119,35 @@ def _parse_oai_record(record_el: ET.Element) -> Dict[str, Any]:
     if dc is None:
         return {}
 
-    get_all = lambda tag: [el.text.strip() for el in dc.findall(f"dc:{tag}", ns) if (el.text or "").strip()]
-
-    identifiers = get_all("identifier")
-    title_list = get_all("title")
-    authors = get_all("creator")
-    abstract_list = get_all("description")
-    dates = get_all("date")
+    identifiers = _dc_texts(dc, "identifier")
+    title_list = _dc_texts(dc, "title")
+    authors = _dc_texts(dc, "creator")
+    abstract_list = _dc_texts(dc, "description")
+    dates = _dc_texts(dc, "date")
 
     title = title_list[0] if title_list else None
     abstract = abstract_list[0] if abstract_list else None
 
     # arXiv id and DOI extraction from identifiers
-    arxiv_id: Optional[str] = None
-    doi: Optional[str] = None
-    landing_url: Optional[str] = None
+    arxiv_id: str | None = None
+    doi: str | None = None
     for ident in identifiers:
-        low = ident.lower()
-        if low.startswith("http://arxiv.org/abs/") or low.startswith("https://arxiv.org/abs/"):
-            landing_url = ident
-            arxiv_id = ident.split("/abs/")[-1]
-        elif low.startswith("doi:"):
-            doi = ident.split(":", 1)[-1].strip()
-        elif low.startswith("http://dx.doi.org/") or low.startswith("https://doi.org/"):
-            doi = ident.split("/doi.org/")[-1] if "/doi.org/" in ident else ident.split("/dx.doi.org/")[-1]
-
-    year: Optional[int] = None
+        m = _ID_RE.match(ident)
+        if m is None:
+            continue
+        if m.lastgroup == "arxiv":
+            arxiv_id = m["arxiv"]
+        else:
+            doi = m[m.lastgroup].strip()
+
+    year: int | None = None
     if dates:
         try:
             year = int(dates[0][:4])
         except Exception:
             year = None
 
-    pdf_url: Optional[str] = None
+    pdf_url: str | None = None
     if arxiv_id:
         pdf_url = f"https://arxiv.org/pdf/{arxiv_id}.pdf"
 
@@ -87,25 +157,195 @@ def _parse_oai_record(record_el: ET.Element) -> Dict[str, Any]:
         "abstract": abstract,
         "doi": doi,
         "arxiv_id": arxiv_id,
-        "landing_url": landing_url or (f"https://arxiv.org/abs/{arxiv_id}" if arxiv_id else None),
+        # Canonical https form, so dedup is an exact source_url match
+        "landing_url": f"https://arxiv.org/abs/{arxiv_id}" if arxiv_id else None,
         "pdf_url": pdf_url,
         "year": year,
     }
 
 
+def _iter_page(stream) -> Iterable[Any]:
+    """Yield each record and resumptionToken element of a ListRecords page as it
+    finishes parsing; elements already handled are freed so memory stays flat."""
+    if _LXML:
+        for _, el in ET.iterparse(stream, events=("end",), tag=(_OAI_RECORD, _OAI_RESUMPTION_TOKEN)):
+            yield el
+            el.clear()
+            while el.getprevious() is not None:
+                del el.getparent()[0]
+        return
+    list_el = None
+    for event, el in ET.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            if el.tag == _OAI_LIST_RECORDS:
+                list_el = el
+        elif el.tag == _OAI_RECORD or el.tag == _OAI_RESUMPTION_TOKEN:
+            yield el
+            if list_el is not None:
+                del list_el[:]
+
+
+def _insert_ignore(session):
+    """INSERT ... ON CONFLICT DO NOTHING RETURNING id for the session's dialect."""
+    dialect = postgresql if session.get_bind().dialect.name == "postgresql" else sqlite
+    table = Document.__table__
+    return dialect.insert(table).on_conflict_do_nothing().returning(table.c.id)
+
+
+def _dumps(obj: Any) -> str:
+    """Compact JSON text, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+
+def _document_row(obj: dict[str, Any]) -> dict[str, Any]:
+    return dict(
+        source_url=obj.get("landing_url") or "",
+        landing_url=obj.get("landing_url"),
+        pdf_url=obj.get("pdf_url"),
+        doi=_clip(obj.get("doi"), 255),
+        title=_clip(obj.get("title"), 1000),
+        authors=_dumps(obj["authors"]) if obj.get("authors") else None,
+        venue=_clip("arXiv", 255),
+        year=obj.get("year"),
+        open_access=True if obj.get("pdf_url") else False,
+        abstract=_clip(obj.get("abstract"), 20000),
+        status="metadata_only",
+        source="arxiv",
+    )
+
+
+def _store_page(session, objs: list[dict[str, Any]]) -> tuple[int, int]:
+    """Insert a page of parsed records, skipping empty ones and duplicates.
+
+    Returns (records added, records that failed to store). A bad record only
+    fails itself: if the bulk INSERT is rejected the page is retried row by
+    row. Errors in the page's duplicate lookup propagate to the caller.
+
+    Duplicates (by arXiv ID, DOI or title) are looked up with one SELECT for the
+    whole page and then checked in memory, including against earlier records of
+    the same page. The survivors go in as one bulk INSERT ... ON CONFLICT DO
+    NOTHING, so on a database that carries its own unique constraints a row
+    another writer stored meanwhile is skipped rather than failing the page.
+    """
+    objs = [o for o in objs if o and (o.get("title") or o.get("doi"))]
+    if not objs:
+        return 0, 0
+    # arXiv records are stored under their abs URL: an equality/IN probe on the
+    # source_url index; http is still matched for rows stored before https
+    id_by_url = {
+        f"{scheme}://arxiv.org/abs/{o['arxiv_id']}": o["arxiv_id"]
+        for o in objs if o.get("arxiv_id")
+        for scheme in ("http", "https")
+    }
+    dois = {o["doi"] for o in objs if o.get("doi")}
+    titles = {o["title"] for o in objs if o.get("title")}
+    conds = []
+    if id_by_url:
+        conds.append(and_(Document.source == "arxiv", Document.source_url.in_(list(id_by_url))))
+    if dois:
+        conds.append(Document.doi.in_(list(dois)))
+    if titles:
+        conds.append(Document.title.in_(list(titles)))
+
+    seen_ids, seen_dois, seen_titles = set(), set(), set()
+    rows = session.query(Document.source, Document.source_url, Document.doi, Document.title).filter(or_(*conds))
+    for source, source_url, doi, title in rows:
+        if source == "arxiv" and source_url in id_by_url:
+            seen_ids.add(id_by_url[source_url])
+        if doi in dois:
+            seen_dois.add(doi)
+        if title in titles:
+            seen_titles.add(title)
+
+    rows = []
+    failed = 0
+    for obj in objs:
+        arxiv_id, doi, title = obj.get("arxiv_id"), obj.get("doi"), obj.get("title")
+        if (arxiv_id and arxiv_id in seen_ids) or (doi and doi in seen_dois) or (title and title in seen_titles):
+            continue
+        try:
+            rows.append(_document_row(obj))
+        except Exception:
+            failed += 1
+            continue
+        if arxiv_id:
+            seen_ids.add(arxiv_id)
+        if doi:
+            seen_dois.add(doi)
+        if title:
+            seen_titles.add(title)
+    if not rows:
+        return 0, failed
+    # RETURNING yields only the rows actually written
+    stmt = _insert_ignore(session)
+    try:
+        added = len(session.execute(stmt, rows).all())
+        session.commit()
+        return added, failed
+    except SQLAlchemyError:
+        session.rollback()
+    # Some row was rejected: store the rest one commit at a time
+    added = 0
+    for row in rows:
+        try:
+            added += len(session.execute(stmt, [row]).all())
+            session.commit()
+        except SQLAlchemyError:
+            session.rollback()
+            failed += 1
+    return added, failed
+
+
+def _fetch_page(
+    http: requests.Session,
+    params: dict[str, str],
+    limit: int | None,
+    delay: float,
+) -> tuple[list[dict[str, Any]], str | None, int]:
+    """Fetch and parse one ListRecords page after sleeping `delay` seconds.
+
+    Returns (parsed records, resumptionToken, records that failed to parse).
+    At most `limit` records are kept; the rest of the page is only parsed for
+    its token. The page is streamed: each <record> is reduced to its dict as
+    soon as it is parsed and then dropped, so a page's DOM never sits in
+    memory whole.
+    """
+    if delay:
+        time.sleep(delay)
+    page: list[dict[str, Any]] = []
+    failed = 0
+    next_token: str | None = None
+    with http.get(ARXIV_OAI_BASE, params=params, timeout=30, stream=True) as resp:
+        resp.raise_for_status()
+        resp.raw.decode_content = True
+        for el in _iter_page(resp.raw):
+            if el.tag == _OAI_RECORD:
+                if limit is None or len(page) < limit:
+                    try:
+                        page.append(_parse_oai_record(el))
+                    except Exception:
+                        failed += 1
+            else:
+                next_token = (el.text or "").strip() or None
+    return page, next_token, failed
+
+
 def harvest_oai_records(
     session,
-    contact_email: Optional[str] = None,
-    from_date: Optional[str] = None,
-    until_date: Optional[str] = None,
-    set_spec: Optional[str] = None,
-    max_records: Optional[int] = None,
+    contact_email: str | None = None,
+    from_date: str | None = None,
+    until_date: str | None = None,
+    set_spec: str | None = None,
+    max_records: int | None = None,
     resume: bool = False,
     throttle_sec: float = 1.0,
-) -> Dict[str, Any]:
+) -> dict[str, Any]:
     """Harvest arXiv via OAI-PMH ListRecords and upsert into DB.
 
     Stores resumptionToken in IngestionState(source="arxiv_oai", checkpoint_key="resumptionToken").
+    Pages are fetched over one pooled HTTP session (`http`), separate from the DB `session`.
     """
     headers = {
         "User-Agent": f"uwss/0.1 (+harvest; {contact_email or 'contact@unknown'})",
@@ -113,7 +353,7 @@ def harvest_oai_records(
     }
 
     # Resume token if requested
-    token: Optional[str] = None
+    token: str | None = None
     if resume:
         st = (
             session.query(IngestionState)
@@ -129,7 +369,7 @@ def harvest_oai_records(
     pages = 0
     start_ts = time.time()
 
-    while True:
+    def list_params(token: str | None) -> dict[str, str]:
         params = {"verb": "ListRecords"}
         if token:
             params["resumptionToken"] = token
@@ -141,81 +381,52 @@ def harvest_oai_records(
                 params["until"] = until_date
             if set_spec:
                 params["set"] = set_spec
+        return params
 
-        resp = requests.get(ARXIV_OAI_BASE, params=params, headers=headers, timeout=30)
-        resp.raise_for_status()
-        root = ET.fromstring(resp.text)
-        ns = {"oai": "http://www.openarchives.org/OAI/2.0/"}
-        recs = root.findall(".//oai:record", ns)
-        pages += 1
-
-        # Upsert each record
-        for rec in recs:
-            try:
-                obj = _parse_oai_record(rec)
-                if not obj or not (obj.get("title") or obj.get("doi")):
-                    processed += 1
-                    # cap by processed count too
-                    if max_records and processed >= max_records:
-                        break
-                    continue
-                # Deduplicate by arXiv ID, DOI, title
-                existing = None
-                if obj.get("arxiv_id"):
-                    existing = session.query(Document).filter(Document.source == "arxiv", Document.source_url.like(f"%/{obj['arxiv_id']}")).first()
-                if existing is None and obj.get("doi"):
-                    existing = session.query(Document).filter(Document.doi == obj["doi"]).first()
-                if existing is None and obj.get("title"):
-                    existing = session.query(Document).filter(Document.title == obj["title"]).first()
-                if existing:
-                    processed += 1
-                    if max_records and processed >= max_records:
-                        break
-                    continue
-                doc = Document(
-                    source_url=obj.get("landing_url") or "",
-                    landing_url=obj.get("landing_url"),
-                    pdf_url=obj.get("pdf_url"),
-                    doi=_clip(obj.get("doi"), 255),
-                    title=_clip(obj.get("title"), 1000),
-                    authors=None if not obj.get("authors") else __import__("json").dumps(obj.get("authors")),
-                    venue=_clip("arXiv", 255),
-                    year=obj.get("year"),
-                    open_access=True if obj.get("pdf_url") else False,
-                    abstract=_clip(obj.get("abstract"), 20000),
-                    status="metadata_only",
-                    source="arxiv",
-                )
-                session.add(doc)
-                inserted += 1
-                processed += 1
-            except Exception:
-                failed += 1
-            # Optional limit on processed
-            if max_records and processed >= max_records:
-                break
-        session.commit()
+    with _http_session(headers) as http:
+        # One fetch worker: while page N is stored and checkpointed here, page N+1
+        # is already being requested (after the throttle delay) and parsed.
+        # Requests stay strictly sequential; the DB is only touched on this thread.
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            future = pool.submit(_fetch_page, http, list_params(token), max_records or None, 0)
+            while True:
+                page, next_token, parse_failed = future.result()
+                # One clock read per page; updated_at is a naive UTC column
+                now = datetime.now(UTC).replace(tzinfo=None)
+                pages += 1
+                processed += len(page)
+                failed += parse_failed
+                token = next_token
+                done = bool(max_records and processed >= max_records) or not token
+                if not done:
+                    remaining = max_records - processed if max_records else None
+                    future = pool.submit(_fetch_page, http, list_params(token), remaining, throttle_sec)
 
-        # Get resumptionToken
-        tok_el = root.find(".//oai:resumptionToken", ns)
-        next_token = tok_el.text.strip() if (tok_el is not None and (tok_el.text or "").strip()) else None
-        # Save checkpoint when resume flag is on
-        if resume:
-            st = (
-                session.query(IngestionState)
-                .filter(IngestionState.source == "arxiv_oai", IngestionState.checkpoint_key == "resumptionToken")
-                .first()
-                or IngestionState(source="arxiv_oai", checkpoint_key="resumptionToken")
-            )
-            st.checkpoint_value = next_token or ""
-            st.updated_at = datetime.utcnow()
-            session.merge(st)
-            session.commit()
+                try:
+                    added, store_failed = _store_page(session, page)
+                except SQLAlchemyError:
+                    # The page could not be stored at all: stop without moving the
+                    # checkpoint past it, so a resumed run fetches it again
+                    session.rollback()
+                    raise
+                inserted += added
+                failed += store_failed
+
+                # Save checkpoint when resume flag is on
+                if resume:
+                    st = (
+                        session.query(IngestionState)
+                        .filter(IngestionState.source == "arxiv_oai", IngestionState.checkpoint_key == "resumptionToken")
+                        .first()
+                        or IngestionState(source="arxiv_oai", checkpoint_key="resumptionToken")
+                    )
+                    st.checkpoint_value = next_token or ""
+                    st.updated_at = now
+                    session.merge(st)
+                    session.commit()
 
-        token = next_token
-        if (max_records and processed >= max_records) or not token:
-            break
-        time.sleep(throttle_sec)
+                if done:
+                    break
 
     return {
         "inserted": inserted,
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+from datetime import UTC, datetime
 from pathlib import Path
-from datetime import datetime
+
 import requests
 
 
@@ -34,7 +35,7 @@ def snapshot_arxiv_policy(out_dir: Path, contact_email: str | None = None) -> di
     # Links record
     links_md = (
         "# arXiv policy snapshot\n\n"
-        f"- captured_at: {datetime.utcnow().isoformat()}Z\n"
+        f"- captured_at: {datetime.now(UTC).replace(tzinfo=None).isoformat()}Z\n"
         f"- oai_identify: {identify_url}\n"
         f"- robots: {robots_url}\n"
         "- bulk_data_docs: https://info.arxiv.org/help/bulk_data.html\n"
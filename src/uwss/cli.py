@@ -140,6 +140,27 @@ def build_parser() -> argparse.ArgumentParser:
 
 	p_mig.set_defaults(func=_cmd_migrate)
 
+	# db-stats (opt-in trigger-maintained per-source counters, SQLite only)
+	p_stats = sub.add_parser("db-stats", help="Keep per-source document counts in documents_stats via triggers (adds write cost)")
+	p_stats.add_argument("--db", default=str(Path("data") / "uwss.sqlite"))
+	p_stats.add_argument("--disable", action="store_true", help="Drop the triggers and the documents_stats table")
+
+	def _cmd_stats(args: argparse.Namespace) -> int:
+		from .store import disable_documents_stats, enable_documents_stats
+		if args.disable:
+			disable_documents_stats(Path(args.db))
+			console.print(f"[green]documents_stats disabled:[/green] {args.db}")
+			return 0
+		try:
+			enable_documents_stats(Path(args.db))
+		except RuntimeError as e:
+			console.print(f"[red]{e}[/red]")
+			return 1
+		console.print(f"[green]documents_stats enabled:[/green] {args.db}")
+		return 0
+
+	p_stats.set_defaults(func=_cmd_stats)
+
 	# db-add-columns (add new columns on Postgres/SQLite for pdf_status/pdf_fetched_at)
 	p_cols = sub.add_parser("db-add-columns", help="Add new columns (pdf_status, pdf_fetched_at) if missing")
 	p_cols.add_argument("--db", default=str(Path("data") / "uwss.sqlite"))
@@ -170,7 +191,7 @@ def build_parser() -> argparse.ArgumentParser:
 	p_cols.set_defaults(func=_cmd_cols)
 
 	# db-create-indexes (works for SQLite and Postgres)
-	p_idx = sub.add_parser("db-create-indexes", help="Create helpful indexes (doi, lower(title), url_hash_sha1)")
+	p_idx = sub.add_parser("db-create-indexes", help="Create helpful indexes (doi, lower(title), url_hash_sha1, source, source/status/doi)")
 	p_idx.add_argument("--db", default=str(Path("data") / "uwss.sqlite"))
 
 	def _cmd_idx(args: argparse.Namespace) -> int:
@@ -188,8 +209,14 @@ def build_parser() -> argparse.ArgumentParser:
 					conn.execute(sql_text("CREATE INDEX IF NOT EXISTS idx_documents_title ON documents(title)"))
 				except Exception:
 					pass
+			# source_url (duplicate check on ingest)
+			conn.execute(sql_text("CREATE INDEX IF NOT EXISTS idx_documents_source_url ON documents(source_url)"))
 			# url_hash_sha1
 			conn.execute(sql_text("CREATE INDEX IF NOT EXISTS idx_documents_urlhash ON documents(url_hash_sha1)"))
+			# source (GROUP BY source / WHERE source = ? in the analysis scripts)
+			conn.execute(sql_text("CREATE INDEX IF NOT EXISTS idx_documents_source ON documents(source)"))
+			# source/status/doi: lets the per-source error-status and duplicate-DOI checks run from the index alone
+			conn.execute(sql_text("CREATE INDEX IF NOT EXISTS idx_documents_source_status_doi ON documents(source, status, doi)"))
 			# pdf_status and year (useful for filters/exports)
 			try:
 				conn.execute(sql_text("CREATE INDEX IF NOT EXISTS idx_documents_pdf_status ON documents(pdf_status)"))
@@ -199,6 +226,11 @@ def build_parser() -> argparse.ArgumentParser:
 				conn.execute(sql_text("CREATE INDEX IF NOT EXISTS idx_documents_year ON documents(year)"))
 			except Exception:
 				pass
+			# refresh planner statistics so the new indexes are actually chosen
+			try:
+				conn.execute(sql_text("ANALYZE documents"))
+			except Exception:
+				pass
 			conn.commit()
 		console.print("[green]Indexes created (or already exist).[/green]")
 		return 0
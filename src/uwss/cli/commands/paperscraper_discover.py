@@ -14,7 +14,7 @@ import time
 from pathlib import Path
 from typing import Any, Dict
 
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, text
 
 from ...store import Base, Document
 from ...store import create_sqlite_engine, create_engine_from_url
@@ -38,6 +38,18 @@ DISCOVER_FUNCTIONS = {
     "chemrxiv": discover_paperscraper_chemrxiv,
 }
 
+# After `uwss db-migrate`, each branch is answered from its own index
+# (idx_documents_doi, idx_documents_source_url, idx_documents_title,
+# idx_documents_title_hash). The exact-title branch covers rows from ingesters
+# that don't set title_hash and that db-migrate has not backfilled yet
+DUPLICATE_SQL = text(
+    "SELECT EXISTS ("
+    "SELECT 1 FROM documents WHERE doi = :doi "
+    "UNION ALL SELECT 1 FROM documents WHERE source_url = :source_url "
+    "UNION ALL SELECT 1 FROM documents WHERE title = :title "
+    "UNION ALL SELECT 1 FROM documents WHERE title_hash = :title_hash)"
+)
+
 
 def register(sub) -> None:
     """Register the paperscraper-discover command."""
@@ -140,30 +152,23 @@ def register(sub) -> None:
             if args.source == "arxiv":
                 discover_kwargs["batch_size"] = args.batch_size
             
+            # Core statements: rows are plain dicts, so no ORM objects, identity
+            # map or unit-of-work flush on the per-record path
+            insert_stmt = insert(Document.__table__)
+            
             for metadata in discover_fn(**discover_kwargs):
                 try:
-                    # Check for duplicates (by DOI first, then source_url, then title)
-                    existing = None
-                    if metadata.get("doi"):
-                        existing = (
-                            session.query(Document)
-                            .filter(Document.doi == metadata["doi"])
-                            .first()
-                        )
-
-                    if not existing and metadata.get("source_url"):
-                        existing = (
-                            session.query(Document)
-                            .filter(Document.source_url == metadata["source_url"])
-                            .first()
-                        )
-
-                    if not existing and metadata.get("title"):
-                        existing = (
-                            session.query(Document)
-                            .filter(Document.title == metadata["title"])
-                            .first()
-                        )
+                    # Check for duplicates by DOI, source_url, title or normalized title
+                    # hash in one round-trip; a NULL key never matches
+                    existing = session.scalar(
+                        DUPLICATE_SQL,
+                        {
+                            "doi": metadata.get("doi") or None,
+                            "source_url": metadata.get("source_url") or None,
+                            "title": metadata.get("title") or None,
+                            "title_hash": metadata.get("title_hash") or None,
+                        },
+                    )
 
                     if existing:
                         logger.debug(
@@ -178,8 +183,7 @@ def register(sub) -> None:
                             continue
 
                     # Create new document
-                    doc = Document(**metadata)
-                    session.add(doc)
+                    session.execute(insert_stmt, metadata)
                     session.commit()
                     inserted += 1
 
@@ -12,8 +12,12 @@ import logging
 import re
 from typing import Optional
 
+from ...store.deduplication import title_hash
+
 logger = logging.getLogger(__name__)
 
+_YEAR_RE = re.compile(r"\d{4}")
+
 
 def _clip(text: Optional[str], max_len: int) -> Optional[str]:
     """Clip text to maximum length for database constraints."""
@@ -26,6 +30,19 @@ def _clip(text: Optional[str], max_len: int) -> Optional[str]:
         return text
 
 
+def _year_from_text(text: str) -> int | None:
+    """Return the first 4-digit run in text as a year.
+
+    ISO-style dates ("2023-05-01") start with the year, so the prefix is
+    checked before falling back to the regex.
+    """
+    head = text[:4]
+    if head.isdecimal() and len(head) == 4:
+        return int(head)
+    match = _YEAR_RE.search(text)
+    return int(match.group(0)) if match else None
+
+
 def map_paperscraper_to_document(
     paper: dict, source: str = "paperscraper"
 ) -> Optional[dict]:
@@ -42,7 +59,7 @@ def map_paperscraper_to_document(
     Notes:
         - Handles various paperscraper output formats
         - Normalizes fields (DOI, authors, etc.)
-        - Generates URL hash for deduplication
+        - Generates URL and title hashes for deduplication
     """
     try:
         # Extract title (required)
@@ -122,9 +139,7 @@ def map_paperscraper_to_document(
             try:
                 # Extract year from date string if needed
                 if isinstance(year_raw, str):
-                    year_match = re.search(r"\d{4}", year_raw)
-                    if year_match:
-                        year = int(year_match.group(0))
+                    year = _year_from_text(year_raw)
                 else:
                     year = int(year_raw)
             except Exception:
@@ -157,6 +172,8 @@ def map_paperscraper_to_document(
             except Exception:
                 pass
 
+        title = _clip(title, 1000)
+
         # Build Document-compatible dictionary
         # Source format: "paperscraper_pubmed" -> "PubMed (via paperscraper)" for display
         # But we keep original source for database consistency
@@ -166,7 +183,7 @@ def map_paperscraper_to_document(
             "landing_url": landing_url or "",
             "pdf_url": pdf_url,
             "doi": _clip(doi, 255),
-            "title": _clip(title, 1000),
+            "title": title,
             "abstract": _clip(abstract, 20000),
             "authors": authors_json,
             "affiliations": affiliations_json,
@@ -176,6 +193,7 @@ def map_paperscraper_to_document(
             "open_access": open_access,
             "oa_status": oa_status,
             "url_hash_sha1": url_hash,
+            "title_hash": title_hash(title),
         }
 
     except Exception as e:
@@ -17,3 +17,10 @@ def migrate_db(db_path):
 	from .db import migrate_db as _f
 	return _f(db_path)
 
+def enable_documents_stats(db_path):
+	from .db import enable_documents_stats as _f
+	return _f(db_path)
+
+def disable_documents_stats(db_path):
+	from .db import disable_documents_stats as _f
+	return _f(db_path)
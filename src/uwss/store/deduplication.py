@@ -5,6 +5,7 @@ Provides standardized deduplication logic that can be reused across all source a
 
 from __future__ import annotations
 
+import hashlib
 import logging
 from typing import Optional
 
@@ -107,6 +108,12 @@ def _normalize_title(title: str) -> str:
     return normalized
 
 
+def title_hash(title: str) -> bytes:
+    """Fingerprint a title for dedupe: BLAKE2b-128 of the normalized title,
+    so case and spacing variants collide. Stored in Document.title_hash."""
+    return hashlib.blake2b(_normalize_title(title).encode("utf-8"), digest_size=16).digest()
+
+
 def merge_document_metadata(existing: Document, new_metadata: dict) -> None:
     """Merge new metadata into existing document (fill missing fields).
     
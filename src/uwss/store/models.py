@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import String, Integer, Boolean, DateTime, Text, Float
+from sqlalchemy import Boolean, DateTime, Float, Integer, LargeBinary, String, Text
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -55,6 +55,8 @@ class Document(Base):
 	checksum_sha256: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
 	# url hash for dedupe
 	url_hash_sha1: Mapped[Optional[str]] = mapped_column(String(40), nullable=True)
+	# BLAKE2b-128 of the lowercased, whitespace-collapsed title, for dedupe
+	title_hash: Mapped[bytes | None] = mapped_column(LargeBinary(16), nullable=True)
 
 
 class IngestionState(Base):
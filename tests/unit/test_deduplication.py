@@ -0,0 +1,37 @@
+"""Unit tests for the title fingerprint used in duplicate checks."""
+
+import hashlib
+
+from src.uwss.sources.paperscraper.mappers import map_paperscraper_to_document
+from src.uwss.store.deduplication import _normalize_title, title_hash
+
+
+def test_normalize_title_collapses_case_and_whitespace():
+    assert _normalize_title("  Deep\tLearning \n for  Concrete ") == "deep learning for concrete"
+    assert _normalize_title("") == ""
+    assert _normalize_title(None) == ""
+
+
+def test_title_hash_is_blake2b_128_of_normalized_title():
+    expected = hashlib.blake2b(b"deep learning", digest_size=16).digest()
+    assert title_hash("Deep Learning") == expected
+    assert len(title_hash("anything")) == 16
+
+
+def test_title_hash_variants_collide():
+    assert title_hash("Deep Learning") == title_hash("  deep   LEARNING\n")
+
+
+def test_title_hash_distinct_titles_differ():
+    assert title_hash("Deep Learning") != title_hash("Deep Learnings")
+    assert title_hash("concrete corrosion") != title_hash("corrosion concrete")
+
+
+def test_title_hash_punctuation_is_significant():
+    # Only case and whitespace are normalized
+    assert title_hash("Concrete: a review") != title_hash("Concrete a review")
+
+
+def test_mapper_sets_title_hash():
+    doc = map_paperscraper_to_document({"title": "  Deep  Learning ", "doi": "10.1/x"})
+    assert doc["title_hash"] == title_hash("deep learning")
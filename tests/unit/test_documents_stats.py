@@ -0,0 +1,126 @@
+"""Unit tests for the opt-in documents_stats counters."""
+
+import sqlite3
+
+import pytest
+
+from src.uwss.store.db import (
+    disable_documents_stats,
+    enable_documents_stats,
+    init_db,
+    migrate_db,
+)
+
+# documents_stats columns after source, computed directly from documents
+EXPECTED_SQL = """
+    SELECT coalesce(source, ''), COUNT(*),
+        SUM(title IS NOT NULL AND title != ''),
+        SUM(abstract IS NOT NULL AND abstract != ''),
+        SUM(doi IS NOT NULL AND doi != ''),
+        SUM(pdf_url IS NOT NULL AND pdf_url != ''),
+        SUM(year IS NOT NULL),
+        SUM(status LIKE '%error%' OR status LIKE '%fail%')
+    FROM documents GROUP BY 1 ORDER BY 1
+"""
+STATS_SQL = """
+    SELECT source, total, with_title, with_abstract, with_doi, with_pdf_url, with_year, with_error
+    FROM documents_stats WHERE total > 0 ORDER BY source
+"""
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "uwss.sqlite"
+    init_db(path)
+    migrate_db(path)
+    return path
+
+
+def insert(conn, source, title=None, doi=None, year=None, status="not_fetched"):
+    conn.execute(
+        "INSERT INTO documents (source_url, source, title, doi, year, status, open_access) "
+        "VALUES ('', ?, ?, ?, ?, ?, 0)",
+        (source, title, doi, year, status),
+    )
+    conn.commit()
+
+
+def stats(conn):
+    return conn.execute(STATS_SQL).fetchall()
+
+
+def expected(conn):
+    return conn.execute(EXPECTED_SQL).fetchall()
+
+
+def table_exists(conn, name):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (name,)).fetchone() is not None
+
+
+def test_migrate_does_not_install_stats(db_path):
+    with sqlite3.connect(db_path) as conn:
+        assert not table_exists(conn, "documents_stats")
+        assert not table_exists(conn, "documents_stats_ins")
+
+
+def test_enable_seeds_from_existing_rows(db_path):
+    with sqlite3.connect(db_path) as conn:
+        insert(conn, "crossref", title="A", doi="10.1/a", year=2020)
+        insert(conn, "arxiv", title="B", status="fetch_error")
+        enable_documents_stats(db_path)
+        assert stats(conn) == expected(conn)
+        assert stats(conn) == [("arxiv", 1, 1, 0, 0, 0, 0, 1), ("crossref", 1, 1, 0, 1, 0, 1, 0)]
+
+
+def test_counts_follow_insert_update_delete(db_path):
+    enable_documents_stats(db_path)
+    with sqlite3.connect(db_path) as conn:
+        insert(conn, "crossref", title="A", doi="10.1/a")
+        insert(conn, "crossref", title="B")
+        insert(conn, None, title="C")
+        assert stats(conn) == expected(conn)
+        assert stats(conn) == [("", 1, 1, 0, 0, 0, 0, 0), ("crossref", 2, 2, 0, 1, 0, 0, 0)]
+
+        conn.execute("UPDATE documents SET year = 2021, status = 'pdf_failed' WHERE title = 'B'")
+        conn.execute("UPDATE documents SET source = 'openalex' WHERE title = 'A'")
+        conn.commit()
+        assert stats(conn) == expected(conn)
+        assert stats(conn) == [
+            ("", 1, 1, 0, 0, 0, 0, 0),
+            ("crossref", 1, 1, 0, 0, 0, 1, 1),
+            ("openalex", 1, 1, 0, 1, 0, 0, 0),
+        ]
+
+        conn.execute("DELETE FROM documents WHERE title IN ('B', 'C')")
+        conn.commit()
+        assert stats(conn) == expected(conn)
+        assert stats(conn) == [("openalex", 1, 1, 0, 1, 0, 0, 0)]
+
+
+def test_enable_reseeds_when_a_trigger_was_dropped(db_path):
+    enable_documents_stats(db_path)
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("DROP TRIGGER documents_stats_ins")
+        conn.commit()
+        insert(conn, "crossref", title="A")
+        assert stats(conn) == []
+        enable_documents_stats(db_path)
+        assert stats(conn) == expected(conn)
+        assert table_exists(conn, "documents_stats_ins")
+
+
+def test_disable_drops_table_and_triggers(db_path):
+    enable_documents_stats(db_path)
+    disable_documents_stats(db_path)
+    with sqlite3.connect(db_path) as conn:
+        assert not table_exists(conn, "documents_stats")
+        for name in ("documents_stats_ins", "documents_stats_del", "documents_stats_upd"):
+            assert not table_exists(conn, name)
+        insert(conn, "crossref", title="A")
+
+
+def test_enable_requires_migrated_database(tmp_path):
+    path = tmp_path / "fresh.sqlite"
+    init_db(path)
+    with pytest.raises(RuntimeError, match="db-migrate"):
+        enable_documents_stats(path)
@@ -0,0 +1,95 @@
+"""Unit tests for storing parsed OAI pages (duplicate handling)."""
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from src.uwss.arxiv.harvest_oai import _store_page
+from src.uwss.store.models import Base, Document
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://", future=True)
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    with SessionLocal() as s:
+        yield s
+
+
+def record(arxiv_id, title=None, doi=None, **extra):
+    return {
+        "arxiv_id": arxiv_id,
+        "landing_url": f"https://arxiv.org/abs/{arxiv_id}" if arxiv_id else None,
+        "pdf_url": f"https://arxiv.org/pdf/{arxiv_id}.pdf" if arxiv_id else None,
+        "title": title,
+        "doi": doi,
+        "authors": ["A. Author"],
+        "abstract": None,
+        "year": 2020,
+        **extra,
+    }
+
+
+def stored_titles(session):
+    return sorted(session.scalars(select(Document.title)))
+
+
+def test_new_records_are_stored(session):
+    page = [record("2001.00001", title="First"), record("2001.00002", title="Second", doi="10.1/b")]
+    assert _store_page(session, page) == (2, 0)
+    assert stored_titles(session) == ["First", "Second"]
+    doc = session.scalars(select(Document).where(Document.doi == "10.1/b")).one()
+    assert doc.source == "arxiv"
+    assert doc.source_url == "https://arxiv.org/abs/2001.00002"
+
+
+def test_records_already_stored_are_skipped(session):
+    session.add_all([
+        # same arXiv id, stored under the old http form
+        Document(source="arxiv", source_url="http://arxiv.org/abs/2001.00001", title="Old one"),
+        # same DOI, stored by another source
+        Document(source="crossref", source_url="https://doi.org/10.1/b", doi="10.1/b", title="Other"),
+        # same title
+        Document(source="openalex", source_url="https://openalex.org/W1", title="Same title"),
+    ])
+    session.commit()
+    page = [
+        record("2001.00001", title="Renamed"),
+        record("2001.00002", title="New title", doi="10.1/b"),
+        record("2001.00003", title="Same title"),
+        record("2001.00004", title="Fresh"),
+    ]
+    assert _store_page(session, page) == (1, 0)
+    assert stored_titles(session) == ["Fresh", "Old one", "Other", "Same title"]
+
+
+def test_an_arxiv_url_from_another_source_is_not_a_duplicate(session):
+    session.add(Document(source="crossref", source_url="https://arxiv.org/abs/2001.00001", title="X"))
+    session.commit()
+    assert _store_page(session, [record("2001.00001", title="Y")]) == (1, 0)
+
+
+def test_duplicates_within_a_page_are_stored_once(session):
+    page = [
+        record("2001.00001", title="One"),
+        record("2001.00001", title="One, again"),
+        record("2001.00002", title="Two", doi="10.1/x"),
+        record("2001.00003", title="Three", doi="10.1/x"),
+        record("2001.00004", title="One"),
+    ]
+    assert _store_page(session, page) == (2, 0)
+    assert stored_titles(session) == ["One", "Two"]
+
+
+def test_empty_records_are_ignored(session):
+    page = [{}, record("2001.00001"), record(None, title=None, doi=None)]
+    assert _store_page(session, page) == (0, 0)
+    assert stored_titles(session) == []
+
+
+def test_a_bad_record_fails_alone(session):
+    # A set of authors cannot be serialized to JSON
+    page = [record("2001.00001", title="Good"), record("2001.00002", title="Bad", authors={"x"})]
+    assert _store_page(session, page) == (1, 1)
+    assert stored_titles(session) == ["Good"]
@@ -0,0 +1,27 @@
+"""Unit tests for the paperscraper mapper helpers."""
+
+from src.uwss.sources.paperscraper.mappers import _year_from_text
+
+
+def test_year_from_iso_date_prefix():
+    assert _year_from_text("2023-05-01") == 2023
+
+
+def test_year_from_bare_year():
+    assert _year_from_text("1999") == 1999
+
+
+def test_year_embedded_in_text():
+    assert _year_from_text("Published 12 March 2021") == 2021
+    assert _year_from_text("Mar 2019") == 2019
+
+
+def test_year_prefix_needs_four_digits():
+    # "12/3/2020": the first four characters are not all digits
+    assert _year_from_text("12/3/2020") == 2020
+    assert _year_from_text("123") is None
+
+
+def test_year_missing():
+    assert _year_from_text("") is None
+    assert _year_from_text("no date given") is None